@@ -0,0 +1,264 @@
+"""
+Catalog Aggregates
+
+Streaming summary statistics that generate_items.py maintains while it
+emits items: per-category counts, quantity totals, inventory value
+(price x quantity), price min/max/mean and approximate price quantiles.
+
+Everything is mergeable. Shards are aggregated independently and combined
+in order, and sidecars from separate (e.g. appended) runs can be merged
+later, so dashboards can read summary numbers without scanning the
+collection.
+
+Quantiles come from a DDSketch-style log-bucketed sketch: any reported
+quantile is within RELATIVE_ACCURACY of the true value, and merging two
+sketches is just adding their bucket counts.
+
+Usage:
+  python scripts/generate_items.py --aggregates sample-data/items.stats.json
+  python scripts/aggregates.py show sample-data/items.stats.json
+  python scripts/aggregates.py merge run1.stats.json run2.stats.json -o total.stats.json
+"""
+import argparse
+import json
+import math
+from collections import Counter
+
+RELATIVE_ACCURACY = 0.01
+QUANTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+VERSION = 1
+
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(key-1), gamma^key] in relative terms
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            "bins": {str(key): count for key, count in sorted(self.bins.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"])
+        sketch.zero_count = data["zero_count"]
+        sketch.bins = {int(key): count for key, count in data["bins"].items()}
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
+
+
+class CategoryStats:
+    def __init__(self):
+        self.count = 0
+        self.quantity_total = 0
+        self.inventory_value = 0.0
+        self.price_sum = 0.0
+        self.price_min = None
+        self.price_max = None
+        self.prices = QuantileSketch()
+
+    def add(self, price, quantity):
+        self.count += 1
+        self.quantity_total += quantity
+        self.inventory_value += price * quantity
+        self.price_sum += price
+        self.price_min = price if self.price_min is None else min(self.price_min, price)
+        self.price_max = price if self.price_max is None else max(self.price_max, price)
+        self.prices.add(price)
+
+    def merge(self, other):
+        self.count += other.count
+        self.quantity_total += other.quantity_total
+        self.inventory_value += other.inventory_value
+        self.price_sum += other.price_sum
+        if other.price_min is not None:
+            self.price_min = other.price_min if self.price_min is None else min(self.price_min, other.price_min)
+            self.price_max = other.price_max if self.price_max is None else max(self.price_max, other.price_max)
+        self.prices.merge(other.prices)
+
+    def summary(self):
+        price = {
+            "min": self.price_min,
+            "max": self.price_max,
+            "mean": round(self.price_sum / self.count, 2) if self.count else None,
+        }
+        for name, q in QUANTILES.items():
+            value = self.prices.quantile(q)
+            price[name] = round(value, 2) if value is not None else None
+        return {
+            "count": self.count,
+            "quantity_total": self.quantity_total,
+            "inventory_value": round(self.inventory_value, 2),
+            "price": price,
+        }
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "quantity_total": self.quantity_total,
+            "inventory_value": self.inventory_value,
+            "price_sum": self.price_sum,
+            "price_min": self.price_min,
+            "price_max": self.price_max,
+            "prices": self.prices.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        for field in ("count", "quantity_total", "inventory_value", "price_sum", "price_min", "price_max"):
+            setattr(stats, field, data[field])
+        stats.prices = QuantileSketch.from_dict(data["prices"])
+        return stats
+
+
+class Aggregates:
+    def __init__(self):
+        self.categories = {}
+
+    def add(self, item):
+        stats = self.categories.get(item["category"])
+        if stats is None:
+            stats = self.categories[item["category"]] = CategoryStats()
+        stats.add(item["price"], item["quantity"])
+
+    def merge(self, other):
+        for category, other_stats in other.categories.items():
+            self.categories.setdefault(category, CategoryStats()).merge(other_stats)
+
+    @property
+    def count(self):
+        return sum(stats.count for stats in self.categories.values())
+
+    def counts(self):
+        return {category: stats.count for category, stats in self.categories.items()}
+
+    def overall(self):
+        total = CategoryStats()
+        for stats in self.categories.values():
+            total.merge(stats)
+        return total
+
+    def to_dict(self):
+        return {
+            "version": VERSION,
+            "overall": self.overall().summary(),
+            "categories": {category: stats.summary() for category, stats in sorted(self.categories.items())},
+            # Raw mergeable state; the summaries above are derived from it
+            "state": {category: stats.to_dict() for category, stats in sorted(self.categories.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != VERSION:
+            raise ValueError(f"Unsupported aggregates version: {data.get('version')}")
+        aggregates = cls()
+        aggregates.categories = {category: CategoryStats.from_dict(state) for category, state in data["state"].items()}
+        return aggregates
+
+
+class CategoryCounts:
+    # Items per category only: what generate_items.py tracks without
+    # --aggregates, at a fraction of the per-item cost
+    def __init__(self):
+        self.categories = Counter()
+
+    def add(self, item):
+        self.categories[item["category"]] += 1
+
+    def merge(self, other):
+        self.categories.update(other.counts())
+
+    def counts(self):
+        return dict(self.categories)
+
+
+def tally(items, aggregates):
+    # Update aggregates while items stream past
+    for item in items:
+        aggregates.add(item)
+        yield item
+
+
+def load(path):
+    with open(path) as f:
+        return Aggregates.from_dict(json.load(f))
+
+
+def save(aggregates, path):
+    with open(path, 'w') as f:
+        json.dump(aggregates.to_dict(), f, indent=2)
+
+
+def print_summary(aggregates):
+    overall = aggregates.overall().summary()
+    price = overall["price"]
+    print(f"Items: {overall['count']}, quantity: {overall['quantity_total']}, "
+          f"inventory value: {overall['inventory_value']:,.2f}")
+    if overall["count"]:
+        print(f"Price: min {price['min']}, mean {price['mean']}, p50 {price['p50']}, "
+              f"p99 {price['p99']}, max {price['max']}")
+    print("\nCategory distribution:")
+    for category, stats in sorted(aggregates.categories.items()):
+        print(f"  {category}: {stats.count}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or merge catalog aggregate sidecars.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    p = commands.add_parser("show", help="print a sidecar's summary")
+    p.add_argument("path")
+    p = commands.add_parser("merge", help="merge sidecars from several shards or runs")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("-o", "--output", required=True, help="merged sidecar path")
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        print_summary(load(args.path))
+        return
+    merged = Aggregates()
+    for path in args.paths:
+        merged.merge(load(path))
+    save(merged, args.output)
+    print_summary(merged)
+
+
+if __name__ == "__main__":
+    main()
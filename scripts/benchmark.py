@@ -0,0 +1,221 @@
+"""
+Generation Benchmarks
+
+Measures each stage of the generate_items.py pipeline on its own:
+
+  generate        generate_item(): random draws plus string formatting
+  format          the name/description str.format calls alone, on pre-drawn values
+  serialize:FMT   encoding pre-generated items (json, ndjson, csv, ...)
+  write           writing pre-encoded json chunks to disk
+
+Stages stream shard by shard, with untimed setup per shard, so memory stays
+bounded even at 10M items. Every (stage, size) case runs in a fresh process
+so its peak RSS is its own.
+
+Results can be saved as a JSON baseline. Comparing a run against a baseline
+exits with status 1 when any case's items/sec drops, or its peak RSS grows,
+by more than the threshold.
+
+Usage:
+  python scripts/benchmark.py                                      # 5k, 100k and 1M items
+  python scripts/benchmark.py --sizes 5000,10000000 --save bench-baseline.json
+  python scripts/benchmark.py --baseline bench-baseline.json --threshold 0.15
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import generate_items as gi
+
+DEFAULT_SIZES = [5000, 100000, 1000000]
+
+
+def shard_ranges(count):
+    for shard in range(gi.shard_count(count)):
+        yield shard, range(shard * gi.SHARD_SIZE, min(count, (shard + 1) * gi.SHARD_SIZE))
+
+
+def bench_generate(count, seed, options):
+    start = time.perf_counter()
+    deque(gi.iter_new_items(count, seed), maxlen=0)
+    return time.perf_counter() - start
+
+
+def draw_format_args(seed, shard, indexes):
+    # Same draws as generate_item(), kept so that only formatting is timed
+    rng = gi.shard_rng(seed, shard)
+    args = []
+    for i in indexes:
+        plan = rng.choice(gi.template_plans[gi.categories[i % len(gi.categories)]])
+        adj = rng.choice(gi.adjectives)
+        name_value = adj if plan.name_pool is gi.ADJ else rng.choice(plan.name_pool)
+        values = [rng.choice(pool) for pool in plan.description_pools]
+        args.append((plan.name, name_value, i + 1, plan.description, adj, values))
+    return args
+
+
+def bench_format(count, seed, options):
+    elapsed = 0.0
+    for shard, indexes in shard_ranges(count):
+        args = draw_format_args(seed, shard, indexes)
+        start = time.perf_counter()
+        for name_format, name_value, number, desc_format, adj, values in args:
+            name_format.format(name_value, number)
+            desc_format.format(adj, *values)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def bench_serialize(count, seed, options):
+    fmt = options["format"]
+    encode_options = gi.bson_writer.document_options() if fmt == "bson" else None
+    elapsed = 0.0
+    for shard, _ in shard_ranges(count):
+        items = list(gi.iter_shard_items(seed, shard, count))
+        first_number = len(gi.existing_items) + shard * gi.SHARD_SIZE
+        start = time.perf_counter()
+        gi.encode_items(fmt, items, seed, first_number, encode_options)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def bench_write(count, seed, options):
+    elapsed = 0.0
+    with tempfile.TemporaryDirectory(dir=options.get("dir")) as tmp:
+        f = open(os.path.join(tmp, "items.json"), 'w')
+        for shard, _ in shard_ranges(count):
+            chunk = gi.encode_json_array(gi.iter_shard_items(seed, shard, count))
+            start = time.perf_counter()
+            f.write(",\n" if shard else "[\n")
+            f.write(chunk)
+            elapsed += time.perf_counter() - start
+        start = time.perf_counter()
+        f.write("\n]")
+        f.flush()
+        if options.get("fsync"):
+            os.fsync(f.fileno())
+        f.close()
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+STAGES = {
+    "generate": bench_generate,
+    "format": bench_format,
+    "serialize": bench_serialize,
+    "write": bench_write,
+}
+
+
+def run_case(stage, count, seed, options):
+    # Runs in its own process; ru_maxrss is in KB on Linux
+    elapsed = STAGES[stage.split(":")[0]](count, seed, options)
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return elapsed, peak_rss_mb
+
+
+def case_names(stages, formats):
+    for stage in stages:
+        if stage == "serialize":
+            yield from (f"serialize:{fmt}" for fmt in formats)
+        else:
+            yield stage
+
+
+def run_benchmarks(stages, sizes, formats, seed=0, repeat=1, options=None):
+    results = {}
+    for size in sizes:
+        for name in case_names(stages, formats):
+            case_options = dict(options or {}, format=name.partition(":")[2])
+            runs = []
+            for _ in range(repeat):
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    runs.append(pool.submit(run_case, name, size, seed, case_options).result())
+            # Best of the repeats: the run least disturbed by the rest of the machine
+            elapsed = min(run[0] for run in runs)
+            result = {
+                "stage": name,
+                "size": size,
+                "seconds": round(elapsed, 4),
+                "items_per_sec": round(size / elapsed if elapsed else 0),
+                "peak_rss_mb": round(min(run[1] for run in runs), 1),
+            }
+            results[f"{name}@{size}"] = result
+            print_result(result)
+    return results
+
+
+def print_result(result):
+    print(f"{result['stage']:<22} {result['size']:>10,} {result['seconds']:>9.3f}s "
+          f"{result['items_per_sec']:>12,} items/s {result['peak_rss_mb']:>9.1f}MB", flush=True)
+
+
+def compare(results, baseline, threshold):
+    # Returns a line per case that regressed by more than threshold
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if result["items_per_sec"] < base["items_per_sec"] * (1 - threshold):
+            regressions.append(f"{key}: {result['items_per_sec']:,} items/s vs baseline "
+                               f"{base['items_per_sec']:,} ({result['items_per_sec'] / base['items_per_sec'] - 1:+.1%})")
+        if result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + threshold):
+            regressions.append(f"{key}: peak RSS {result['peak_rss_mb']}MB vs baseline "
+                               f"{base['peak_rss_mb']}MB ({result['peak_rss_mb'] / base['peak_rss_mb'] - 1:+.1%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark each stage of the item generation pipeline.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated item counts (e.g. 5000,100000,10000000)")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated stages to run")
+    parser.add_argument("--formats", default="json,ndjson", help="formats for the serialize stage")
+    parser.add_argument("--seed", type=int, default=0, help="generation seed")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case; the fastest is reported")
+    parser.add_argument("--dir", default=None, help="directory for the write stage's temporary file")
+    parser.add_argument("--fsync", action="store_true", help="include fsync in the write stage")
+    parser.add_argument("--save", default=None, help="write results to this JSON baseline file")
+    parser.add_argument("--baseline", default=None, help="compare against this JSON baseline file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed relative regression in items/sec or peak RSS (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    stages = args.stages.split(",")
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    formats = args.formats.split(",")
+    if not set(formats) <= set(gi.FORMATS):
+        parser.error(f"--formats must be among: {', '.join(sorted(gi.FORMATS))}")
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    print(f"{'stage':<22} {'items':>10} {'time':>10} {'throughput':>20} {'peak RSS':>11}")
+    results = run_benchmarks(stages, sizes, formats, args.seed, args.repeat, {"dir": args.dir, "fsync": args.fsync})
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"\nResults written to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+BSON Writer
+
+mongorestore-ready BSON output for generate_items.py. Each item becomes a
+document shaped like the ones Item.create() stores: a pre-assigned `_id`
+ObjectId, a `createdBy` placeholder user id, and `createdAt`/`updatedAt`
+spread over a configurable time window (newer documents get later ids, as
+MongoDB would assign them).
+
+The encoder only handles the handful of BSON types these documents use and
+has no dependencies, so dumps can be built and checked fully offline.
+
+Usage:
+  python scripts/generate_items.py --count 1000000 --format bson -o dump/nextcrud/items.bson
+  python scripts/bson_writer.py dump/nextcrud/items.bson   # Decode and round-trip check a dump
+  mongorestore --db nextcrud --collection items dump/nextcrud/items.bson
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import random
+import struct
+import sys
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ONE_MS = timedelta(milliseconds=1)
+
+# Stands in for the admin user's _id until the loader rewrites it
+PLACEHOLDER_USER_ID = "000000000000000000000000"
+
+DEFAULT_WINDOW_DAYS = 365
+
+
+class ObjectId(bytes):
+    def __new__(cls, value):
+        if isinstance(value, str):
+            value = bytes.fromhex(value)
+        if len(value) != 12:
+            raise ValueError(f"ObjectId must be 12 bytes, got {len(value)}")
+        return super().__new__(cls, value)
+
+    def __repr__(self):
+        return f"ObjectId('{self.hex()}')"
+
+    @property
+    def generation_time(self):
+        return EPOCH + timedelta(seconds=int.from_bytes(self[:4], "big"))
+
+
+def object_id_arg(value):
+    # argparse type for --created-by, so a bad id fails before generation
+    try:
+        ObjectId(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value!r} is not a 24-digit hex ObjectId")
+    return value
+
+
+def make_object_id(timestamp, prefix, number):
+    # 4-byte seconds timestamp, then a 5-byte run prefix and 3-byte counter.
+    # The document number spills into the low prefix bytes, so ids never
+    # repeat within a run even when many documents share one second.
+    machine = (prefix << 32) | ((number >> 24) & 0xFFFFFFFF)
+    return ObjectId(struct.pack(">I", timestamp) + machine.to_bytes(5, "big") + (number & 0xFFFFFF).to_bytes(3, "big"))
+
+
+def document_options(created_by=PLACEHOLDER_USER_ID, window_days=DEFAULT_WINDOW_DAYS, end=None):
+    end = end or datetime.now(timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    end_ms = (end - EPOCH) // ONE_MS
+    return {
+        "created_by": created_by,
+        "end_ms": end_ms,
+        "window_ms": int(window_days * 86400 * 1000),
+    }
+
+
+def assign_document_fields(items, seed, first_number, options):
+    # Draws come from an RNG keyed on (seed, first document number), so the
+    # result does not depend on how shards were spread across workers
+    digest = hashlib.sha256(f"{seed}:documents:{first_number}".encode()).digest()
+    rng = random.Random(int.from_bytes(digest[:8], "big"))
+    prefix = digest[8]
+    created_by = ObjectId(options["created_by"])
+    end_ms = options["end_ms"]
+    window_ms = options["window_ms"]
+
+    for number, item in enumerate(items, first_number):
+        created_ms = end_ms - int(rng.random() * window_ms)
+        # About half the catalog has been edited since it was created
+        updated_ms = created_ms if rng.random() < 0.5 else created_ms + int(rng.random() * (end_ms - created_ms))
+        yield {
+            "_id": make_object_id(created_ms // 1000, prefix, number),
+            **item,
+            "createdBy": created_by,
+            "createdAt": EPOCH + timedelta(milliseconds=created_ms),
+            "updatedAt": EPOCH + timedelta(milliseconds=updated_ms),
+            "__v": 0,
+        }
+
+
+def _cstring(key):
+    return key.encode() + b"\x00"
+
+
+def encode_document(doc):
+    parts = []
+    for key, value in doc.items():
+        name = _cstring(key)
+        if isinstance(value, ObjectId):
+            parts.append(b"\x07" + name + value)
+        elif isinstance(value, str):
+            data = value.encode()
+            parts.append(b"\x02" + name + struct.pack("<i", len(data) + 1) + data + b"\x00")
+        elif isinstance(value, bool):
+            parts.append(b"\x08" + name + (b"\x01" if value else b"\x00"))
+        elif isinstance(value, int):
+            if -2**31 <= value < 2**31:
+                parts.append(b"\x10" + name + struct.pack("<i", value))
+            else:
+                parts.append(b"\x12" + name + struct.pack("<q", value))
+        elif isinstance(value, float):
+            parts.append(b"\x01" + name + struct.pack("<d", value))
+        elif isinstance(value, datetime):
+            parts.append(b"\x09" + name + struct.pack("<q", (value - EPOCH) // ONE_MS))
+        elif value is None:
+            parts.append(b"\x0a" + name)
+        else:
+            raise TypeError(f"Cannot encode {key}={value!r} as BSON")
+    body = b"".join(parts)
+    return struct.pack("<i", len(body) + 5) + body + b"\x00"
+
+
+def encode_documents(docs):
+    return b"".join(encode_document(doc) for doc in docs)
+
+
+def decode_document(data, offset=0):
+    size, = struct.unpack_from("<i", data, offset)
+    end = offset + size - 1
+    if data[end] != 0:
+        raise ValueError(f"Document at offset {offset} is not NUL-terminated")
+    pos = offset + 4
+    doc = {}
+    while pos < end:
+        kind = data[pos]
+        key_end = data.find(b"\x00", pos + 1)
+        key = data[pos + 1:key_end].decode()
+        pos = key_end + 1
+        if kind == 0x07:
+            doc[key] = ObjectId(bytes(data[pos:pos + 12]))
+            pos += 12
+        elif kind == 0x02:
+            length, = struct.unpack_from("<i", data, pos)
+            doc[key] = bytes(data[pos + 4:pos + 3 + length]).decode()
+            pos += 4 + length
+        elif kind == 0x08:
+            doc[key] = data[pos] == 1
+            pos += 1
+        elif kind == 0x10:
+            doc[key], = struct.unpack_from("<i", data, pos)
+            pos += 4
+        elif kind == 0x12:
+            doc[key], = struct.unpack_from("<q", data, pos)
+            pos += 8
+        elif kind == 0x01:
+            doc[key], = struct.unpack_from("<d", data, pos)
+            pos += 8
+        elif kind == 0x09:
+            ms, = struct.unpack_from("<q", data, pos)
+            doc[key] = EPOCH + timedelta(milliseconds=ms)
+            pos += 8
+        elif kind == 0x0a:
+            doc[key] = None
+        else:
+            raise ValueError(f"Unsupported BSON type 0x{kind:02x} for key {key!r}")
+    return doc, offset + size
+
+
+def iter_documents(data):
+    offset = 0
+    while offset < len(data):
+        doc, offset = decode_document(data, offset)
+        yield doc
+
+
+def verify_dump(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0, None, None
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    count = 0
+    ids = set()
+    oldest = newest = None
+    offset = 0
+    while offset < len(data):
+        doc, end = decode_document(data, offset)
+        if encode_document(doc) != data[offset:end]:
+            raise ValueError(f"Document {count} does not round-trip")
+        if doc["updatedAt"] < doc["createdAt"]:
+            raise ValueError(f"Document {count} was updated before it was created")
+        ids.add(doc["_id"])
+        oldest = min(oldest or doc["createdAt"], doc["createdAt"])
+        newest = max(newest or doc["createdAt"], doc["createdAt"])
+        count += 1
+        offset = end
+
+    if len(ids) != count:
+        raise ValueError(f"{count - len(ids)} duplicate _id values")
+    return count, oldest, newest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decode a BSON dump and check every document round-trips.")
+    parser.add_argument("path", help="BSON file written with --format bson")
+    args = parser.parse_args(argv)
+
+    try:
+        count, oldest, newest = verify_dump(args.path)
+    except (ValueError, KeyError, struct.error) as exc:
+        print(f"Invalid dump: {exc}")
+        sys.exit(1)
+    print(f"Verified {count} documents with unique ids")
+    if count:
+        print(f"createdAt range: {oldest.isoformat()} .. {newest.isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
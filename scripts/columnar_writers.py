@@ -0,0 +1,107 @@
+"""
+Columnar Writers
+
+Parquet and Arrow IPC output for generate_items.py. Each shard becomes one
+Arrow record batch (one Parquet row group), written as soon as it is
+generated. `category` is dictionary-encoded against the fixed category list,
+and `quantity`/`price` are stored as fixed-width int32/float64 columns.
+
+Requires pyarrow.
+
+Usage:
+  python scripts/generate_items.py --count 1000000 --format parquet -o items.parquet
+  python scripts/columnar_writers.py --count 200000   # Size/throughput of every format vs json.dump
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import generate_items as gi
+
+CATEGORY_INDEX = {category: i for i, category in enumerate(gi.categories)}
+CATEGORY_DICTIONARY = pa.array(gi.categories, pa.string())
+
+SCHEMA = pa.schema([
+    ("name", pa.string()),
+    ("description", pa.string()),
+    ("category", pa.dictionary(pa.int8(), pa.string())),
+    ("quantity", pa.int32()),
+    ("price", pa.float64()),
+])
+
+
+def items_to_batch(items):
+    items = list(items)
+    # Every batch shares one dictionary, which Arrow IPC files require
+    category = pa.DictionaryArray.from_arrays(
+        pa.array([CATEGORY_INDEX[item["category"]] for item in items], pa.int8()),
+        CATEGORY_DICTIONARY,
+    )
+    return pa.record_batch([
+        pa.array([item["name"] for item in items], pa.string()),
+        pa.array([item["description"] for item in items], pa.string()),
+        category,
+        pa.array([item["quantity"] for item in items], pa.int32()),
+        pa.array([item["price"] for item in items], pa.float64()),
+    ], schema=SCHEMA)
+
+
+def write_batches(batches, path, fmt):
+    if fmt == "parquet":
+        with pq.ParquetWriter(path, SCHEMA) as writer:
+            for batch in batches:
+                if batch.num_rows:
+                    writer.write_batch(batch)
+    elif fmt == "arrow":
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, SCHEMA) as writer:
+            for batch in batches:
+                if batch.num_rows:
+                    writer.write_batch(batch)
+    else:
+        raise ValueError(f"Unsupported columnar format: {fmt}")
+
+
+def compare_formats(items, directory):
+    # json.dump(..., indent=2) of the whole list is the baseline the
+    # original script used; every other format streams shard-sized chunks
+    results = []
+    path = os.path.join(directory, "items.json.dump")
+    start = time.perf_counter()
+    with open(path, 'w') as f:
+        json.dump(items, f, indent=2)
+    results.append(("json.dump", time.perf_counter() - start, os.path.getsize(path)))
+
+    for fmt in ("json", "ndjson", "csv", "parquet", "arrow"):
+        layout = gi.FORMATS[fmt]
+        path = os.path.join(directory, f"items.{fmt}")
+        start = time.perf_counter()
+        chunks = (layout["encode"](items[i:i + gi.SHARD_SIZE]) for i in range(0, len(items), gi.SHARD_SIZE))
+        layout["write"](chunks, path, fmt)
+        results.append((fmt, time.perf_counter() - start, os.path.getsize(path)))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare output size and write throughput per format.")
+    parser.add_argument("--count", type=int, default=100000, help="number of items to write")
+    parser.add_argument("--seed", type=int, default=0, help="generation seed")
+    args = parser.parse_args(argv)
+
+    items = list(gi.iter_new_items(args.count, args.seed))
+    with tempfile.TemporaryDirectory() as directory:
+        results = compare_formats(items, directory)
+
+    baseline = results[0][2]
+    print(f"{'format':<10} {'size':>10} {'vs json':>8} {'seconds':>8} {'items/s':>12} {'MB/s':>8}")
+    for fmt, elapsed, size in results:
+        print(f"{fmt:<10} {size / 1e6:>8.1f}MB {size / baseline:>7.1%} {elapsed:>8.2f} "
+              f"{len(items) / elapsed:>12,.0f} {size / 1e6 / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Compact Items
+
+Memory-efficient in-memory representation of generated items. Instead of
+one dict of strings per item, a CompactCatalog keeps parallel `array`
+columns of small integers: template id, adjective id, the id of the value
+drawn for each template slot, model number, price in cents and quantity.
+Under 20 bytes per item in total.
+
+Names and descriptions are only rendered from the compiled template plans
+when an item is read, so 10M+ items fit in memory for dedupe and analytics.
+
+Catalogs are filled with the same draws, in the same order, as
+generate_item(), so catalog[i] equals the dict the generator emits for
+the same seed and model number width.
+
+Usage:
+  python scripts/compact_items.py --count 1000000   # Compare memory use against a list of dicts
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from array import array
+
+import generate_items as gi
+
+# Every compiled plan across all categories, addressed by a global template id.
+# Only the draws are taken from these; names use the catalog's own width.
+TEMPLATES = [(category, plan) for category in gi.categories for plan in gi.template_plans[category]]
+CATEGORY_TEMPLATE_IDS = {}
+for template_id, (category, _) in enumerate(TEMPLATES):
+    CATEGORY_TEMPLATE_IDS.setdefault(category, []).append(template_id)
+
+DESCRIPTION_SLOTS = max(len(plan.description_pools) for _, plan in TEMPLATES)
+
+
+class CompactCatalog:
+    def __init__(self, width=None):
+        # Names are rendered with model numbers padded to width digits
+        # (default: generate_items' current width)
+        plans = gi.plans_for_width(width or gi.MODEL_WIDTH)
+        self.name_formats = [plan.name for category in gi.categories for plan in plans[category]]
+        self.template = array("H")
+        self.adjective = array("B")
+        self.name_slot = array("B")
+        self.description_slots = [array("B") for _ in range(DESCRIPTION_SLOTS)]
+        self.model = array("I")
+        self.price_cents = array("I")
+        self.quantity = array("H")
+
+    def __len__(self):
+        return len(self.template)
+
+    def append_generated(self, category, index, rng):
+        # Same draws in the same order as generate_item(); randrange(n)
+        # consumes the RNG exactly like choice() on an n-element pool
+        template_ids = CATEGORY_TEMPLATE_IDS[category]
+        template_id = template_ids[rng.randrange(len(template_ids))]
+        plan = TEMPLATES[template_id][1]
+        self.template.append(template_id)
+        self.adjective.append(rng.randrange(len(gi.adjectives)))
+        self.name_slot.append(0 if plan.name_pool is gi.ADJ else rng.randrange(len(plan.name_pool)))
+        for s, column in enumerate(self.description_slots):
+            column.append(rng.randrange(len(plan.description_pools[s])) if s < len(plan.description_pools) else 0)
+        self.model.append(index + 1)
+        self.price_cents.append(round(round(rng.uniform(plan.min_price, plan.max_price), 2) * 100))
+        self.quantity.append(rng.randint(5, 500))
+
+    def extend_generated(self, count, seed):
+        # Mirrors iter_new_items(count, seed)
+        for shard in range(gi.shard_count(count)):
+            rng = gi.shard_rng(seed, shard)
+            for i in range(shard * gi.SHARD_SIZE, min(count, (shard + 1) * gi.SHARD_SIZE)):
+                self.append_generated(gi.categories[i % len(gi.categories)], i, rng)
+
+    def category(self, i):
+        return TEMPLATES[self.template[i]][0]
+
+    def price(self, i):
+        return self.price_cents[i] / 100
+
+    def name(self, i):
+        plan = TEMPLATES[self.template[i]][1]
+        if plan.name_pool is gi.ADJ:
+            value = gi.adjectives[self.adjective[i]]
+        else:
+            value = plan.name_pool[self.name_slot[i]]
+        return self.name_formats[self.template[i]].format(value, self.model[i])
+
+    def description(self, i):
+        plan = TEMPLATES[self.template[i]][1]
+        values = [pool[column[i]] for pool, column in zip(plan.description_pools, self.description_slots)]
+        return plan.description.format(gi.adjectives[self.adjective[i]], *values)
+
+    def content_key(self, i):
+        # Identifies items that differ only by model number, without rendering strings
+        return (self.template[i], self.adjective[i], self.name_slot[i],
+                *(column[i] for column in self.description_slots))
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("catalog index out of range")
+        return {
+            "name": self.name(i),
+            "description": self.description(i),
+            "category": self.category(i),
+            "quantity": self.quantity[i],
+            "price": self.price(i),
+        }
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def nbytes(self):
+        columns = [self.template, self.adjective, self.name_slot, self.model, self.price_cents, self.quantity]
+        return sum(column.itemsize * len(column) for column in columns + self.description_slots)
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare memory use of compact and dict item representations.")
+    parser.add_argument("--count", type=int, default=200000, help="number of items")
+    parser.add_argument("--seed", type=int, default=0, help="generation seed")
+    args = parser.parse_args(argv)
+    gi.set_model_width(gi.model_width_for(args.count))
+
+    dicts, dict_current, dict_peak, dict_time = measure(lambda: list(gi.iter_new_items(args.count, args.seed)))
+
+    def build_compact():
+        catalog = CompactCatalog()
+        catalog.extend_generated(args.count, args.seed)
+        return catalog
+
+    catalog, compact_current, compact_peak, compact_time = measure(build_compact)
+
+    mismatches = sum(1 for expected, actual in zip(dicts, catalog) if expected != actual)
+    per_item = max(args.count, 1)
+    print(f"{'representation':<16} {'retained':>10} {'peak':>10} {'bytes/item':>11} {'build s':>8}")
+    print(f"{'list of dicts':<16} {dict_current / 1e6:>8.1f}MB {dict_peak / 1e6:>8.1f}MB "
+          f"{dict_current / per_item:>11.1f} {dict_time:>8.2f}")
+    print(f"{'CompactCatalog':<16} {compact_current / 1e6:>8.1f}MB {compact_peak / 1e6:>8.1f}MB "
+          f"{compact_current / per_item:>11.1f} {compact_time:>8.2f}")
+    print(f"Saving: {dict_current / max(compact_current, 1):.1f}x; "
+          f"{mismatches} of {len(dicts)} materialized items differ from the generator")
+
+
+if __name__ == "__main__":
+    main()
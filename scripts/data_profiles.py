@@ -0,0 +1,145 @@
+"""
+Data Profiles
+
+Named data shapes for generate_items.py --data-profile, for benchmarking
+search and sort on skewed but reproducible catalogs. The default profile
+leaves generation untouched; the others change:
+
+  category_s        Zipf exponent for category sizes (0: round-robin, as
+                    in the default). Which categories are largest depends
+                    on the seed.
+  clause_alpha      Pareto shape for extra spec clauses appended to
+                    descriptions (None: none). Lower means a longer tail.
+  max_clauses       cap on extra clauses per description
+  price_sigma       lognormal spread applied to template prices (0: none)
+  zero_stock        share of items with quantity 0
+  quantity_alpha    Pareto shape for quantities from 5 up (None: uniform
+                    5-500, as in the default)
+  duplicate_names   share of items that reuse the name of an earlier item
+                    in their shard, i.e. the share import-data.ts would skip
+                    as already existing
+
+Profile draws come from their own per-shard RNG, so the template, name and
+description picks are the same as in the default profile for the same seed
+and category.
+
+Usage:
+  python scripts/generate_items.py --count 1000000 --data-profile adversarial -o items.json
+  python scripts/data_profiles.py --count 100000 --data-profile long-text
+"""
+import argparse
+import hashlib
+import itertools
+import random
+from bisect import bisect
+from collections import Counter
+
+import generate_items as gi
+
+DEFAULTS = {
+    "category_s": 0.0,
+    "clause_alpha": None,
+    "max_clauses": 0,
+    "price_sigma": 0.0,
+    "zero_stock": 0.0,
+    "quantity_alpha": None,
+    "duplicate_names": 0.0,
+}
+
+PROFILES = {
+    "default": {},
+    "skewed": {"category_s": 1.5},
+    "long-text": {"clause_alpha": 1.1, "max_clauses": 400},
+    "duplicates": {"duplicate_names": 0.2},
+    "adversarial": {"category_s": 1.5, "clause_alpha": 1.1, "max_clauses": 400, "price_sigma": 1.0,
+                    "zero_stock": 0.1, "quantity_alpha": 1.2, "duplicate_names": 0.05},
+}
+
+# Names an item can copy for duplicate_names, kept per shard
+NAME_RESERVOIR = 256
+
+CLAUSE_LEADS = ["with", "includes", "rated for", "compatible with", "available in", "tested to", "backed by"]
+
+
+class DataShape:
+    def __init__(self, name, seed):
+        if name not in PROFILES:
+            raise SystemExit(f"Unknown data profile {name!r}; choose from {', '.join(PROFILES)}")
+        self.name = name
+        self.seed = seed
+        self.params = {**DEFAULTS, **PROFILES[name]}
+        ranking = list(gi.categories)
+        random.Random(f"{seed}:{name}:categories").shuffle(ranking)
+        self.ranking = ranking
+        s = self.params["category_s"]
+        self.cum_weights = list(itertools.accumulate(1 / k ** s for k in range(1, len(ranking) + 1)))
+        # Spec values of every template in the category, for padding clauses
+        self.spec_values = {
+            category: sorted({str(value) for plan in plans for pool in plan.description_pools for value in pool})
+            for category, plans in gi.template_plans.items()
+        }
+
+    def shard_rng(self, shard):
+        digest = hashlib.sha256(f"{self.seed}:{self.name}:{shard}".encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def category(self, index, rng):
+        if not self.params["category_s"]:
+            return gi.categories[index % len(gi.categories)]
+        return self.ranking[bisect(self.cum_weights, rng.random() * self.cum_weights[-1])]
+
+    def apply(self, item, rng, names):
+        # `names` is the shard's reservoir of earlier names, updated here
+        params = self.params
+        if params["clause_alpha"] is not None:
+            clauses = min(params["max_clauses"], int(rng.paretovariate(params["clause_alpha"])) - 1)
+            values = self.spec_values[item["category"]] or gi.adjectives
+            if clauses > 0:
+                item["description"] += ", " + ", ".join(
+                    f"{rng.choice(CLAUSE_LEADS)} {rng.choice(values)}" for _ in range(clauses))
+        if params["price_sigma"]:
+            item["price"] = max(round(item["price"] * rng.lognormvariate(0, params["price_sigma"]), 2), 0.01)
+        if rng.random() < params["zero_stock"]:
+            item["quantity"] = 0
+        elif params["quantity_alpha"] is not None:
+            item["quantity"] = min(int(5 * rng.paretovariate(params["quantity_alpha"])), 1_000_000)
+        if names and rng.random() < params["duplicate_names"]:
+            item["name"] = rng.choice(names)
+        elif len(names) < NAME_RESERVOIR:
+            names.append(item["name"])
+        else:
+            names[rng.randrange(NAME_RESERVOIR)] = item["name"]
+        return item
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize the data shape a profile produces.")
+    parser.add_argument("--data-profile", choices=sorted(PROFILES), default="adversarial")
+    parser.add_argument("--count", type=int, default=100000, help="items to sample")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    gi.set_data_profile(args.data_profile, args.seed)
+    items = list(gi.iter_new_items(args.count, args.seed))
+    sizes = Counter(item["category"] for item in items)
+    lengths = sorted(len(item["description"]) for item in items)
+    names = Counter(item["name"] for item in items)
+    quantities = sorted(item["quantity"] for item in items)
+    prices = sorted(item["price"] for item in items)
+
+    def quantile(values, q):
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    print(f"Profile {args.data_profile}: {args.count:,} items (seed {args.seed})")
+    print(f"  {'':<12} {'p50':>10} {'p99':>10} {'max':>10}")
+    for label, values in [("description", lengths), ("price", prices), ("quantity", quantities)]:
+        print(f"  {label:<12} {quantile(values, 0.5):>10} {quantile(values, 0.99):>10} {values[-1]:>10}")
+    print(f"  out of stock: {quantities.count(0) / len(items):.1%}")
+    print(f"  repeated names: {1 - len(names) / len(items):.1%} of items reuse an earlier item's name")
+    print("\nCategory sizes:")
+    for category, size in sizes.most_common():
+        print(f"  {category}: {size:,} ({size / len(items):.1%})")
+
+
+if __name__ == "__main__":
+    main()
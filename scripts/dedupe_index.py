@@ -0,0 +1,278 @@
+"""
+Dedupe Index
+
+A binary sidecar (<output>.keys) that lets a loader decide insert, update
+or skip for every item without querying the database per document, as
+import-data.ts does with Item.findOne({ name }).
+
+Each item gets a record of three little-endian uint64s:
+  key       BLAKE2b-64 of its natural key, the trimmed name (as import-data.ts
+            and the Item schema's trim treat it)
+  position  its position in the snapshot
+  content   BLAKE2b-64 of name, description, category, quantity and price as
+            canonical JSON, so timestamps, _id and field order don't count
+Records are sorted by (key, position) after a 16-byte header (magic,
+count). The sorted keys double as the membership structure (binary search
+on the mapped file), and two sidecars can be diffed in one merge pass:
+
+  insert     key not in the old snapshot
+  update     key present, content changed
+  skip       key present, content unchanged
+  duplicate  a later item with a name already seen in the new snapshot
+             (import-data.ts skips these too)
+
+Keys only in the old snapshot are counted as removed but not acted on.
+With 64-bit hashes, a collision among 50M names has a probability of
+about 1 in 15,000.
+
+generate_items.py --dedupe-index writes the sidecar while it generates;
+`build` makes one from any json/ndjson file, including mongoexport output
+of the live collection. It streams ndjson and keeps 24 bytes per item; a
+.json array is loaded whole, so export large collections as ndjson.
+
+Usage:
+  python scripts/generate_items.py --count 1000000 --format ndjson --dedupe-index -o items.ndjson
+  python scripts/dedupe_index.py build live-export.ndjson -o live.keys
+  python scripts/dedupe_index.py diff live.keys items.ndjson.keys --items items.ndjson -o plan/
+  python scripts/dedupe_index.py has items.ndjson.keys "Portable Projector"
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+import generate_items as gi
+
+MAGIC = b"ITEMKEYS"
+HEADER = struct.Struct("<8sQ")
+RECORD = struct.Struct("<QQQ")
+CONTENT_FIELDS = ("name", "description", "category", "quantity", "price")
+INSERT, UPDATE, SKIP, DUPLICATE = 1, 2, 3, 4
+ACTIONS = {INSERT: "insert", UPDATE: "update", SKIP: "skip", DUPLICATE: "duplicate"}
+
+
+def keys_path(path):
+    return path + ".keys"
+
+
+def hash64(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def key_hash(name):
+    return hash64(name.strip().encode())
+
+
+def content_hash(item):
+    content = {field: item.get(field) for field in CONTENT_FIELDS}
+    return hash64(json.dumps(content, sort_keys=True, separators=(",", ":")).encode())
+
+
+def tally_keys(items, records, first_position):
+    # Passes items through while appending their (key, position, content) records
+    for position, item in enumerate(items, first_position):
+        records.append((key_hash(item["name"]), position, content_hash(item)))
+        yield item
+
+
+def pack_records(records):
+    # One sorted run, small enough to ship back from a worker
+    return b"".join(RECORD.pack(*record) for record in sorted(records))
+
+
+def save_keys(runs, path):
+    # Merges sorted runs (packed bytes, or mapped sidecars) into one sidecar
+    count = sum(run.count if isinstance(run, KeySet) else len(run) // RECORD.size for run in runs)
+    merged = heapq.merge(*(run.records() if isinstance(run, KeySet) else RECORD.iter_unpack(run) for run in runs))
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, count))
+        batch = []
+        for record in merged:
+            batch.append(RECORD.pack(*record))
+            if len(batch) >= 65536:
+                f.write(b"".join(batch))
+                batch.clear()
+        f.write(b"".join(batch))
+
+
+def extend_keys(path, runs):
+    # Rewrites an existing sidecar with the new runs merged in; sequential,
+    # 24 bytes per item, and no item data is read
+    with KeySet(path) as existing:
+        save_keys([existing, *runs], path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+class KeySet:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        magic, self.count = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC:
+            self.file.close()
+            raise SystemExit(f"{path} is not a dedupe index")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def records(self):
+        return RECORD.iter_unpack(memoryview(self.data)[HEADER.size:])
+
+    def record(self, i):
+        return RECORD.unpack_from(self.data, HEADER.size + i * RECORD.size)
+
+    def find(self, name):
+        # Position of the first item with this name, or None
+        key = key_hash(name)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.record(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self.record(lo)[0] == key:
+            return self.record(lo)[1]
+        return None
+
+    def __contains__(self, name):
+        return self.find(name) is not None
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def diff(old, new):
+    # One merge pass over two KeySets. Returns (action per new position, as a
+    # bytearray of INSERT/UPDATE/SKIP/DUPLICATE, and the number of removed keys).
+    # Positions in a sidecar are 0..count-1
+    actions = bytearray(new.count)
+    old_records = old.records()
+    current = next(old_records, None)
+    removed = 0
+    previous = None
+    for key, position, content in new.records():
+        if key == previous:
+            actions[position] = DUPLICATE
+            continue
+        previous = key
+        while current is not None and current[0] < key:
+            removed += 1
+            skipped = current[0]
+            while current is not None and current[0] == skipped:
+                current = next(old_records, None)
+        if current is not None and current[0] == key:
+            actions[position] = SKIP if current[2] == content else UPDATE
+            while current is not None and current[0] == key:
+                current = next(old_records, None)
+        else:
+            actions[position] = INSERT
+    while current is not None:
+        removed += 1
+        skipped = current[0]
+        while current is not None and current[0] == skipped:
+            current = next(old_records, None)
+    return actions, removed
+
+
+def iter_items(paths):
+    # Items from json or ndjson files (optionally compressed), in order.
+    # ndjson is streamed; a .json array is loaded whole
+    for path in paths:
+        plain = os.path.splitext(path)[0] if gi.codec_for_path(path) else path
+        if plain.endswith(".ndjson") or plain.endswith(".jsonl"):
+            with gi.open_text(path) as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        else:
+            yield from gi.load_items(path)
+
+
+def build(paths, path):
+    # Packs a sorted run every gi.SHARD_SIZE items and merges the runs, as
+    # the generator does, so memory is 24 bytes per item plus one run
+    runs = []
+    records = []
+    count = 0
+    for _ in tally_keys(iter_items(paths), records, 0):
+        if len(records) == gi.SHARD_SIZE:
+            runs.append(pack_records(records))
+            count += len(records)
+            records.clear()
+    runs.append(pack_records(records))
+    save_keys(runs, path)
+    return count + len(records)
+
+
+def write_plan(actions, paths, directory):
+    # Streams the new snapshot once, writing inserts and updates as ndjson
+    # for mongoimport (updates with --mode upsert --upsertFields name)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "insert.ndjson"), 'w') as inserts, \
+            open(os.path.join(directory, "update.ndjson"), 'w') as updates:
+        outputs = {INSERT: inserts, UPDATE: updates}
+        for position, item in enumerate(iter_items(paths)):
+            out = outputs.get(actions[position]) if position < len(actions) else None
+            if out is not None:
+                out.write(json.dumps(item) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build, query and diff item dedupe indexes.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="write a dedupe index for json/ndjson item files")
+    build_cmd.add_argument("items", nargs="+",
+                           help="item files, in catalog order; ndjson is streamed, but a .json array is "
+                                "loaded into memory whole, so export large collections as ndjson")
+    build_cmd.add_argument("-o", "--output", default=None, help="sidecar path (default: <first file>.keys)")
+    diff_cmd = sub.add_parser("diff", help="classify the new snapshot's items against the old one")
+    diff_cmd.add_argument("old")
+    diff_cmd.add_argument("new")
+    diff_cmd.add_argument("--items", nargs="+", default=None,
+                          help="the new snapshot's item files, to write insert.ndjson and update.ndjson "
+                               "(a .json array is loaded whole; ndjson is streamed)")
+    diff_cmd.add_argument("-o", "--output", default="sample-data/plan", help="directory for the plan files")
+    has_cmd = sub.add_parser("has", help="look names up in a dedupe index")
+    has_cmd.add_argument("keys")
+    has_cmd.add_argument("names", nargs="+")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "build":
+        output = args.output or keys_path(args.items[0])
+        count = build(args.items, output)
+        print(f"Indexed {count:,} items in {time.perf_counter() - start:.2f}s -> {output}")
+    elif args.command == "has":
+        with KeySet(args.keys) as keys:
+            for name in args.names:
+                position = keys.find(name)
+                print(f"  {name}: {'missing' if position is None else f'position {position}'}")
+    else:
+        with KeySet(args.old) as old, KeySet(args.new) as new:
+            actions, removed = diff(old, new)
+        elapsed = time.perf_counter() - start
+        counts = {name: actions.count(action) for action, name in ACTIONS.items()}
+        print(f"Diffed {old.count:,} old against {new.count:,} new items in {elapsed:.2f}s")
+        for name, count in counts.items():
+            print(f"  {name}: {count:,}")
+        print(f"  removed (only in old, not applied): {removed:,}")
+        if args.items:
+            write_plan(actions, args.items, args.output)
+            print(f"Plan written to {args.output}/insert.ndjson and {args.output}/update.ndjson")
+        elif counts["insert"] or counts["update"]:
+            print("Pass --items with the new snapshot's files to write the plan", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
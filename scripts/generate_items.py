@@ -1,5 +1,66 @@
+"""
+Item Generator
+
+Generates sample inventory items and writes them to sample-data/items.json.
+Items are produced lazily and streamed to disk one at a time, so memory use
+stays flat no matter how many items are requested.
+
+Usage:
+  python scripts/generate_items.py                          # 5000 items -> sample-data/items.json
+  python scripts/generate_items.py --count 20000000 --format ndjson -o items.ndjson
+  python scripts/generate_items.py --count 50000000 --workers 32 --seed 42 -o items.json
+  python scripts/generate_items.py --count 10000000 --format parquet -o items.parquet
+  python scripts/generate_items.py --count 1000000 --format bson --time-end 2026-01-01 -o items.bson
+  python scripts/generate_items.py --count 10000000 --format json-compact --workers 8 -o items.json.zst
+  python scripts/generate_items.py --count 1000000 --profile --profile-with cprofile
+  python scripts/generate_items.py --count 1000000 --append --seed 42 -o items.json
+  python scripts/generate_items.py --count 10000000 --format ndjson --shards 16 -o items.ndjson
+  python scripts/generate_items.py --count 10000000 --format ndjson --offset-index -o items.ndjson
+  python scripts/generate_items.py --count 1000000 --format ndjson --dedupe-index -o items.ndjson
+  python scripts/generate_items.py --count 1000000 --data-profile adversarial -o items.json
+
+Items are generated in fixed-size shards, each with its own RNG derived from
+(seed, shard), so a given seed produces identical output for any --workers.
+
+With --compress (or an output path ending in .gz or .zst), each shard is
+compressed inside its worker as an independent gzip member or zstd frame.
+Concatenated members and frames are valid streams, so the file decompresses
+with plain gunzip, zstd -d or Python's gzip module.
+
+Every run also writes <output>.meta.json (format, compression, model number
+width, next index and the runs so far). --append reads only that file, or
+for uncompressed text output without one the file's last 64KB, then strips
+the array footer and writes new items after the last one, so growing a
+catalog costs only the new items. Model numbers are padded to a fixed width
+(enough for --count, or --model-width) and continue from the last one.
+Appending with the same seed and engine gives the same file as one larger
+run.
+
+--shards N writes N files (items-00000-of-00016.ndjson, ...) holding
+contiguous, equal-sized item ranges, and items.manifest.json in place of
+the metadata file; see shard_manifest.py.
+"""
+import argparse
+import csv
+import gzip
+import hashlib
+import io
 import json
+import os
 import random
+import re
+import time
+from array import array
+from collections import deque, namedtuple
+from itertools import chain, islice
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import aggregates
+import bson_writer
+import ndjson_index
+import profiling
+import shard_manifest
 
 # Existing items
 existing_items = [
@@ -484,79 +545,170 @@ specs = {
     "color": ["Black", "White", "Silver", "Gray", "Blue", "Red", "Green"],
 }
 
-def generate_item(category, index):
-    templates = product_templates[category]
-    template = random.choice(templates)
+# Fixed value pools used by specific templates
+PHONE_TYPES = ["Desk", "Conference", "Wireless", "VoIP"]
+CHAIR_TYPES = ["Executive", "Mesh", "Leather", "Task"]
+DESK_TYPES = ["Standing", "Executive", "Corner", "Computer"]
+DRIVE_TYPES = ["SSD", "HDD", "NVMe"]
+PANEL_TYPES = ["IPS", "VA", "TN", "OLED"]
+TIERS = ["Standard", "Premium", "Professional"]
+
+# Slot marker meaning "fill with the item's adjective"
+ADJ = None
+
+# Suffix that makes each generated name unique. Model numbers are padded
+# to MODEL_WIDTH digits so names sort in generation order.
+MODEL_WIDTH = 4
+
+
+def model_suffix(width):
+    return f" - Model {{:0{width}d}}"
+
+
+MODEL_SUFFIX = model_suffix(MODEL_WIDTH)
+
+# A template compiled once into format strings plus the spec pools that feed
+# them. The name takes (slot value, model number); description fields are
+# numbered, with {0} for the item's adjective and {1}.. for each pool in draw order.
+TemplatePlan = namedtuple(
+    "TemplatePlan", ["name", "name_pool", "description", "description_pools", "min_price", "max_price"]
+)
+
+
+def name_slots_for(name_template):
+    if "Monitor" in name_template or "Camera" in name_template or "Speaker" in name_template:
+        return [specs["screen_size"]]
+    if "Phone" in name_template:
+        return [PHONE_TYPES]
+    if "Chair" in name_template:
+        return [CHAIR_TYPES]
+    if "Desk" in name_template:
+        return [DESK_TYPES]
+    return [ADJ]
+
+
+def description_slots_for(desc_template):
+    lower = desc_template.lower()
+    placeholder_count = desc_template.count('{}')
+
+    if placeholder_count == 1:
+        if "RAM" in desc_template or "memory" in lower:
+            return [specs["ram"]]
+        if "storage" in desc_template or "TB" in desc_template or "GB" in desc_template:
+            return [specs["capacity"]]
+        if "watt" in lower:
+            return [specs["watts"]]
+        if "user" in lower or "license" in lower:
+            return [specs["users"]]
+        if "port" in lower:
+            return [specs["ports"]]
+        if "ft" in desc_template or "meter" in lower:
+            return [specs["length"]]
+        if "count" in lower or "pack" in lower:
+            return [specs["count"]]
+        if "month" in lower:
+            return [specs["months"]]
+        if "resolution" in lower:
+            return [specs["resolution"]]
+        return [ADJ]
+    if placeholder_count == 2:
+        if "RAM" in desc_template or "memory" in lower:
+            return [specs["ram"], specs["storage"]]
+        if "storage" in desc_template:
+            return [specs["capacity"], DRIVE_TYPES]
+        return [ADJ, specs["color"]]
+    if placeholder_count == 3:
+        if "display" in desc_template or "monitor" in lower or "screen" in desc_template:
+            return [specs["screen_size"], PANEL_TYPES, specs["refresh_rate"]]
+        return [ADJ, specs["color"], TIERS]
+    # No placeholders, or more than we know how to fill: used verbatim
+    return []
+
+
+def bind_description(template, slots):
+    if not slots:
+        # Used verbatim, so escape any braces left in the template
+        return template.replace("{", "{{").replace("}", "}}"), []
+    pieces = template.split("{}")
+    fmt = pieces[0]
+    pools = []
+    for slot, piece in zip(slots, pieces[1:]):
+        if slot is ADJ:
+            fmt += "{0}" + piece
+        else:
+            pools.append(slot)
+            fmt += "{%d}" % len(pools) + piece
+    return fmt, pools
+
+
+def compile_template(template, width=MODEL_WIDTH):
     name_template, desc_template, min_price, max_price = template
-    
-    # Generate random specs
-    adj = random.choice(adjectives)
-    
-    # Replace {} in name
     if "{}" in name_template:
-        if "Monitor" in name_template or "Camera" in name_template or "Speaker" in name_template:
-            name = name_template.format(random.choice(specs["screen_size"]))
-        elif "Phone" in name_template:
-            name = name_template.format(random.choice(["Desk", "Conference", "Wireless", "VoIP"]))
-        elif "Chair" in name_template:
-            name = name_template.format(random.choice(["Executive", "Mesh", "Leather", "Task"]))
-        elif "Desk" in name_template:
-            name = name_template.format(random.choice(["Standing", "Executive", "Corner", "Computer"]))
-        else:
-            name = name_template.format(adj)
+        name_pool, = name_slots_for(name_template)
     else:
-        name = f"{adj} {name_template}"
-    
-    # Make name unique with index
-    name = f"{name} - Model {index+1:04d}"
-    
-    # Generate description - count placeholders first
-    placeholder_count = desc_template.count('{}')
-    
-    if placeholder_count == 0:
-        desc = desc_template
-    elif placeholder_count == 1:
-        if "RAM" in desc_template or "memory" in desc_template.lower():
-            desc = desc_template.format(random.choice(specs["ram"]))
-        elif "storage" in desc_template or "TB" in desc_template or "GB" in desc_template:
-            desc = desc_template.format(random.choice(specs["capacity"]))
-        elif "watt" in desc_template.lower():
-            desc = desc_template.format(random.choice(specs["watts"]))
-        elif "user" in desc_template.lower() or "license" in desc_template.lower():
-            desc = desc_template.format(random.choice(specs["users"]))
-        elif "port" in desc_template.lower():
-            desc = desc_template.format(random.choice(specs["ports"]))
-        elif "ft" in desc_template or "meter" in desc_template.lower():
-            desc = desc_template.format(random.choice(specs["length"]))
-        elif "count" in desc_template.lower() or "pack" in desc_template.lower():
-            desc = desc_template.format(random.choice(specs["count"]))
-        elif "month" in desc_template.lower():
-            desc = desc_template.format(random.choice(specs["months"]))
-        elif "resolution" in desc_template.lower():
-            desc = desc_template.format(random.choice(specs["resolution"]))
-        else:
-            desc = desc_template.format(adj)
-    elif placeholder_count == 2:
-        if "RAM" in desc_template or "memory" in desc_template.lower():
-            desc = desc_template.format(random.choice(specs["ram"]), random.choice(specs["storage"]))
-        elif "storage" in desc_template:
-            desc = desc_template.format(random.choice(specs["capacity"]), random.choice(["SSD", "HDD", "NVMe"]))
-        else:
-            desc = desc_template.format(adj, random.choice(specs["color"]))
-    elif placeholder_count == 3:
-        if "display" in desc_template or "monitor" in desc_template.lower() or "screen" in desc_template:
-            desc = desc_template.format(random.choice(specs["screen_size"]), random.choice(["IPS", "VA", "TN", "OLED"]), random.choice(specs["refresh_rate"]))
-        else:
-            desc = desc_template.format(adj, random.choice(specs["color"]), random.choice(["Standard", "Premium", "Professional"]))
+        name_template = "{} " + name_template
+        name_pool = ADJ
+    desc_format, desc_pools = bind_description(desc_template, description_slots_for(desc_template))
+    return TemplatePlan(name_template + model_suffix(width), name_pool, desc_format, desc_pools, min_price,
+                        max_price)
+
+
+def compile_templates(templates_by_category, width=MODEL_WIDTH):
+    return {
+        category: [compile_template(template, width) for template in templates]
+        for category, templates in templates_by_category.items()
+    }
+
+
+template_plans = compile_templates(product_templates)
+_plans_by_width = {MODEL_WIDTH: template_plans}
+
+
+def plans_for_width(width):
+    # Template plans with model numbers padded to width digits, compiled once
+    if width not in _plans_by_width:
+        _plans_by_width[width] = compile_templates(product_templates, width)
+    return _plans_by_width[width]
+
+
+def model_width_for(count):
+    return max(4, len(str(count)))
+
+
+def set_model_width(width):
+    # Switches generate_item() to model numbers padded to width digits. Only
+    # affects this module: the numpy and counter engines take the width as an
+    # argument, since they may see a different copy of it (__main__).
+    global MODEL_WIDTH, MODEL_SUFFIX, template_plans
+    MODEL_WIDTH = width
+    MODEL_SUFFIX = model_suffix(width)
+    template_plans = plans_for_width(width)
+
+
+def generate_item(category, index, rng=random):
+    name_format, name_pool, desc_format, desc_pools, min_price, max_price = rng.choice(template_plans[category])
+    adj = rng.choice(adjectives)
+    choice = rng.choice
+
+    name = name_format.format(adj if name_pool is ADJ else choice(name_pool), index + 1)
+
+    # Pools are drawn in slot order, so output matches the original dispatch
+    pool_count = len(desc_pools)
+    if pool_count == 0:
+        desc = desc_format.format(adj)
+    elif pool_count == 1:
+        desc = desc_format.format(adj, choice(desc_pools[0]))
+    elif pool_count == 2:
+        desc = desc_format.format(adj, choice(desc_pools[0]), choice(desc_pools[1]))
     else:
-        desc = desc_template
-    
+        desc = desc_format.format(adj, *map(choice, desc_pools))
+
     # Generate price
-    price = round(random.uniform(min_price, max_price), 2)
-    
+    price = round(rng.uniform(min_price, max_price), 2)
+
     # Generate quantity
-    quantity = random.randint(5, 500)
-    
+    quantity = rng.randint(5, 500)
+
     return {
         "name": name,
         "description": desc,
@@ -565,32 +717,697 @@ def generate_item(category, index):
         "price": price
     }
 
-# Generate 5000 new items
-new_items = []
 categories = list(product_templates.keys())
 
-for i in range(5000):
-    category = categories[i % len(categories)]
-    item = generate_item(category, i)
-    new_items.append(item)
+# Items per shard; fixed so that output never depends on the worker count
+SHARD_SIZE = 10000
+
+
+def shard_count(count):
+    return (count + SHARD_SIZE - 1) // SHARD_SIZE
+
+
+def shard_rng(seed, shard):
+    digest = hashlib.sha256(f"{seed}:{shard}".encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+# Active --data-profile, as a data_profiles.DataShape; None is the default shape
+data_shape = None
+
+
+def set_data_profile(name, seed):
+    global data_shape
+    if name in (None, "default"):
+        data_shape = None
+    elif data_shape is None or (data_shape.name, data_shape.seed) != (name, seed):
+        import data_profiles
+        data_shape = data_profiles.DataShape(name, seed)
+
+
+def iter_shard_items(seed, shard, count, width=None):
+    if width is not None:
+        set_model_width(width)
+    rng = shard_rng(seed, shard)
+    if data_shape is not None:
+        shape_rng = data_shape.shard_rng(shard)
+        names = []
+        for i in range(shard * SHARD_SIZE, min(count, (shard + 1) * SHARD_SIZE)):
+            yield data_shape.apply(generate_item(data_shape.category(i, shape_rng), i, rng), shape_rng, names)
+        return
+    for i in range(shard * SHARD_SIZE, min(count, (shard + 1) * SHARD_SIZE)):
+        category = categories[i % len(categories)]
+        yield generate_item(category, i, rng)
+
+
+def profiled_shard_items(seed, shard, count, timers):
+    # Twin of iter_shard_items() for --profile that times random draws and
+    # string formatting separately. Formatting consumes no randomness, so
+    # doing all draws first keeps the items identical.
+    rng = shard_rng(seed, shard)
+    choice = rng.choice
+    clock = time.perf_counter
+    draw = fmt = 0.0
+    items = []
+    for i in range(shard * SHARD_SIZE, min(count, (shard + 1) * SHARD_SIZE)):
+        category = categories[i % len(categories)]
+        t0 = clock()
+        name_format, name_pool, desc_format, desc_pools, min_price, max_price = choice(template_plans[category])
+        adj = choice(adjectives)
+        name_value = adj if name_pool is ADJ else choice(name_pool)
+        values = [choice(pool) for pool in desc_pools]
+        price = round(rng.uniform(min_price, max_price), 2)
+        quantity = rng.randint(5, 500)
+        t1 = clock()
+        items.append({
+            "name": name_format.format(name_value, i + 1),
+            "description": desc_format.format(adj, *values),
+            "category": category,
+            "quantity": quantity,
+            "price": price
+        })
+        t2 = clock()
+        draw += t1 - t0
+        fmt += t2 - t1
+    timers.add("draw", draw)
+    timers.add("format", fmt)
+    return items
+
+
+def get_shard_items(engine):
+    if engine == "numpy":
+        try:
+            from numpy_engine import shard_items
+        except ImportError as exc:
+            raise SystemExit(f"--engine numpy requires numpy>=2 ({exc})")
+        return shard_items
+    if engine == "counter":
+        from virtual_items import shard_items
+        return shard_items
+    return iter_shard_items
+
+
+def iter_new_items(count, seed):
+    for shard in range(shard_count(count)):
+        yield from iter_shard_items(seed, shard, count)
+
+
+def iter_all_items(count, seed):
+    yield from existing_items
+    yield from iter_new_items(count, seed)
+
+
+def encode_ndjson(items):
+    return "".join(json.dumps(item) + "\n" for item in items)
+
+
+def encode_json_array(items):
+    # Array elements exactly as json.dump(..., indent=2) lays them out,
+    # without the surrounding "[\n" and "\n]"
+    return json.dumps(list(items), indent=2)[2:-2]
+
+
+def encode_json_compact(items):
+    return json.dumps(list(items), separators=(",", ":"))[1:-1]
+
+
+FIELDS = ["name", "description", "category", "quantity", "price"]
+CSV_HEADER = ",".join(FIELDS) + "\n"
+
+
+def encode_csv(items):
+    buf = io.StringIO()
+    csv.DictWriter(buf, FIELDS, lineterminator="\n").writerows(items)
+    return buf.getvalue()
+
+
+def load_columnar():
+    try:
+        import columnar_writers
+    except ImportError as exc:
+        raise SystemExit(f"--format parquet/arrow requires pyarrow ({exc})")
+    return columnar_writers
+
+
+def encode_record_batch(items):
+    return load_columnar().items_to_batch(items)
+
+
+def write_columnar(chunks, path, fmt, options=None):
+    load_columnar().write_batches(chunks, path, fmt)
+
+
+def write_text(chunks, path, fmt, options=None):
+    options = options or {}
+    codec = options.get("compress")
+    append = options.get("append", False)
+    if codec:
+        with open(path, 'ab' if append else 'wb') as f:
+            write_chunks(chunks, BlockWriter(f, codec, options.get("level")), fmt, append)
+        return
+    with open(path, 'a' if append else 'w') as f:
+        write_chunks(chunks, f, fmt, append)
+
+
+def write_binary(chunks, path, fmt, options=None):
+    with open(path, 'ab' if (options or {}).get("append") else 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+CODEC_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+
+
+def codec_for_path(path):
+    return CODEC_SUFFIXES.get(os.path.splitext(path)[1])
+
+
+def load_zstd():
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise SystemExit(f"--compress zstd requires zstandard ({exc})")
+    return zstandard
+
+
+class CompressedBlock(bytes):
+    # A compressed chunk that remembers how large it was before compression
+    raw_size = 0
+
+
+def compress_block(data, codec, level=None):
+    if isinstance(data, str):
+        data = data.encode()
+    if not data:
+        return CompressedBlock()
+    if codec == "gzip":
+        # mtime=0 keeps the output byte-identical across runs
+        block = CompressedBlock(gzip.compress(data, 6 if level is None else level, mtime=0))
+    else:
+        block = CompressedBlock(load_zstd().ZstdCompressor(level=3 if level is None else level).compress(data))
+    block.raw_size = len(data)
+    return block
+
+
+class BlockWriter:
+    # File wrapper for write_chunks(): shard chunks arrive already compressed,
+    # while the small header/separator/footer strings are compressed here
+    def __init__(self, f, codec, level=None):
+        self.f = f
+        self.codec = codec
+        self.level = level
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = compress_block(data, self.codec, self.level)
+        self.f.write(data)
+
+
+# Text formats are encoded to strings per shard and joined by write_chunks();
+# columnar formats are encoded to Arrow record batches, one row group each.
+# A "prepare" step, when present, turns items into stored documents first.
+FORMATS = {
+    "json": {"encode": encode_json_array, "write": write_text,
+             "header": "[\n", "sep": ",\n", "footer": "\n]", "empty": "[]"},
+    "json-compact": {"encode": encode_json_compact, "write": write_text,
+                     "header": "[", "sep": ",", "footer": "]", "empty": "[]"},
+    "ndjson": {"encode": encode_ndjson, "write": write_text,
+               "header": "", "sep": "", "footer": "", "empty": ""},
+    "csv": {"encode": encode_csv, "write": write_text,
+            "header": CSV_HEADER, "sep": "", "footer": "", "empty": CSV_HEADER},
+    "parquet": {"encode": encode_record_batch, "write": write_columnar},
+    "arrow": {"encode": encode_record_batch, "write": write_columnar},
+    "bson": {"prepare": bson_writer.assign_document_fields, "encode": bson_writer.encode_documents,
+             "write": write_binary},
+}
+
+
+# ---------- Appending to an existing output ----------
+
+MODEL_NUMBER = re.compile(r" - Model (\d+)")
+TAIL_BYTES = 64 * 1024
+META_VERSION = 1
+PATH_FORMATS = {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv", ".bson": "bson",
+                ".parquet": "parquet", ".arrow": "arrow"}
+
+
+def meta_path(path):
+    return path + ".meta.json"
+
+
+def read_meta(path):
+    try:
+        with open(meta_path(path)) as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+    if meta.get("version") != META_VERSION:
+        raise SystemExit(f"Unsupported metadata version in {meta_path(path)}: {meta.get('version')}")
+    return meta
+
+
+def write_meta(path, meta):
+    with open(meta_path(path), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+def read_tail(path, size=TAIL_BYTES):
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        f.seek(max(0, end - size))
+        return f.read().decode(errors="ignore")
+
+
+def infer_append_state(path):
+    # For outputs without metadata: the format comes from the file name and
+    # the next index from the last model number in the tail. Only possible
+    # for uncompressed text output.
+    fmt = PATH_FORMATS.get(os.path.splitext(path)[1], "json")
+    if codec_for_path(path) or fmt not in ("json", "ndjson", "csv"):
+        raise SystemExit(f"Cannot append to {path} without its metadata file {meta_path(path)}")
+    tail = read_tail(path)
+    if fmt == "json" and not tail.endswith("\n]"):
+        fmt = "json-compact"
+    numbers = MODEL_NUMBER.findall(tail)
+    if not numbers:
+        raise SystemExit(f"Cannot find a model number near the end of {path}")
+    return {"version": META_VERSION, "format": fmt, "compress": None, "level": None,
+            "model_width": len(numbers[-1]), "items": None, "next_index": int(numbers[-1]), "runs": []}
+
+
+def encoded_footer(fmt, codec=None, level=None):
+    footer = FORMATS[fmt].get("footer", "")
+    return compress_block(footer, codec, level) if codec else footer.encode()
+
+
+def truncate_footer(path, footer):
+    # Removes the array footer so new items can be written after the last one
+    if not footer:
+        return
+    with open(path, 'r+b') as f:
+        end = f.seek(0, os.SEEK_END)
+        f.seek(max(0, end - len(footer)))
+        if f.read() != footer:
+            raise SystemExit(f"{path} does not end with the expected footer; was it modified or truncated?")
+        f.truncate(end - len(footer))
+
+
+def open_text(path):
+    # Opens plain, gzip or zstd output for reading as text
+    codec = codec_for_path(path)
+    if codec == "gzip":
+        return gzip.open(path, 'rt')
+    if codec == "zstd":
+        reader = load_zstd().ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True,
+                                                              closefd=True)
+        return io.TextIOWrapper(reader)
+    return open(path)
+
+
+def load_items(path):
+    # Read back a json or ndjson output file, optionally compressed
+    with open_text(path) as f:
+        if codec_for_path(path):
+            path = os.path.splitext(path)[0]
+        if path.endswith(".ndjson") or path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+def encode_items(fmt, items, seed, first_number, options=None, skip=0):
+    # first_number is the position of items[0] in the output, counting
+    # existing items; the first `skip` items are prepared but not encoded
+    layout = FORMATS[fmt]
+    options = options or {}
+    if "prepare" in layout:
+        items = layout["prepare"](items, seed, first_number, options)
+    if skip:
+        items = islice(items, skip, None)
+    chunk = layout["encode"](items)
+    if options.get("compress"):
+        chunk = compress_block(chunk, options["compress"], options.get("level"))
+    return chunk
+
+
+def encode_shard(fmt, seed, shard, count, engine="python", options=None, start=0):
+    # Encodes the shard's items with index in [start, count). Returns the
+    # chunk, its aggregates, with options["profile"] its stage timers and,
+    # with options["dedupe"], its sorted dedupe index records.
+    options = options or {}
+    if "model_width" in options:
+        set_model_width(options["model_width"])
+    set_data_profile(options.get("data_profile"), seed)
+    stats = aggregates.Aggregates() if options.get("aggregates") else aggregates.CategoryCounts()
+    # Items before start are still generated (and prepared), so that every
+    # RNG reaches the first wanted item in the same state as in a full run
+    skip = max(0, start - shard * SHARD_SIZE)
+    first_number = len(existing_items) + shard * SHARD_SIZE
+    keys = [] if options.get("dedupe") else None
+    if not options.get("profile"):
+        items = iter(get_shard_items(engine)(seed, shard, count, MODEL_WIDTH))
+        wanted = tally_keys(items, keys, first_number + skip)
+        items = chain(list(islice(items, skip)), aggregates.tally(wanted, stats))
+        chunk = encode_items(fmt, items, seed, first_number, options, skip)
+        return chunk, stats, None, pack_keys(keys)
+
+    timers = profiling.StageTimers()
+    if engine == "python" and data_shape is None:
+        items = profiled_shard_items(seed, shard, count, timers)
+    else:
+        items = timers.time("generate", lambda: list(get_shard_items(engine)(seed, shard, count, MODEL_WIDTH)))
+    wanted = tally_keys(items[skip:], keys, first_number + skip)
+    items = chain(items[:skip], aggregates.tally(wanted, stats))
+    return profiled_encode(fmt, items, seed, first_number, options, timers, skip), stats, timers, pack_keys(keys)
+
+
+def tally_keys(items, keys, first_position):
+    # Collects dedupe index records when `keys` is a list
+    if keys is None:
+        return items
+    import dedupe_index
+    return dedupe_index.tally_keys(items, keys, first_position)
+
+
+def pack_keys(keys):
+    if keys is None:
+        return None
+    import dedupe_index
+    return dedupe_index.pack_records(keys)
+
+
+def profiled_encode(fmt, items, seed, first_number, options, timers, skip=0):
+    chunk = timers.time("encode", encode_items, fmt, items, seed, first_number, dict(options, compress=None), skip)
+    if options.get("compress"):
+        chunk = timers.time("compress", compress_block, chunk, options["compress"], options.get("level"))
+    return chunk
+
+
+def iter_encoded_shards(fmt, count, seed, workers=1, engine="python", options=None, start=0):
+    # Shards covering item indexes start..count-1
+    shards = range(start // SHARD_SIZE, shard_count(count))
+    if workers <= 1:
+        for shard in shards:
+            yield encode_shard(fmt, seed, shard, count, engine, options, start)
+        return
+
+    # Keep a bounded window of shards in flight and yield them in order
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for shard in shards:
+            pending.append(pool.submit(encode_shard, fmt, seed, shard, count, engine, options, start))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_chunks(chunks, f, fmt, append=False):
+    # When appending, the file already holds the header and earlier items
+    layout = FORMATS[fmt]
+    written = append
+    for chunk in chunks:
+        if not chunk:
+            continue
+        f.write(layout["sep"] if written else layout["header"])
+        f.write(chunk)
+        written = True
+    f.write(layout["footer"] if written else layout["empty"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate sample inventory items.")
+    parser.add_argument("--count", type=int, default=5000, help="number of new items to generate")
+    parser.add_argument("--format", choices=sorted(FORMATS), default=None,
+                        help="json (indented array, the default), json-compact (no whitespace), ndjson (one item "
+                             "per line), csv, parquet or arrow (Arrow IPC file; both require pyarrow), "
+                             "or bson (mongorestore-ready documents)")
+    parser.add_argument("-o", "--output", default="sample-data/items.json", help="output file path")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible output (default: random)")
+    parser.add_argument("--workers", type=int, default=1, help="number of generator processes")
+    parser.add_argument("--engine", choices=["python", "numpy", "counter"], default="python",
+                        help="per-item random module engine, vectorized numpy batch engine, or counter-based "
+                             "engine where each item is a hash of (seed, index)")
+    parser.add_argument("--created-by", type=bson_writer.object_id_arg, default=bson_writer.PLACEHOLDER_USER_ID,
+                        help="bson: user ObjectId (hex) stored as createdBy")
+    parser.add_argument("--time-window-days", type=float, default=bson_writer.DEFAULT_WINDOW_DAYS,
+                        help="bson: spread createdAt over this many days before --time-end")
+    parser.add_argument("--time-end", type=datetime.fromisoformat, default=None,
+                        help="bson: newest createdAt as an ISO timestamp (default: now, UTC)")
+    parser.add_argument("--aggregates", default=None,
+                        help="write per-category counts, totals and price quantiles to this JSON sidecar")
+    parser.add_argument("--compress", choices=["none", "gzip", "zstd"], default=None,
+                        help="compress output per shard (default: from the .gz/.zst output suffix; zstd "
+                             "requires zstandard)")
+    parser.add_argument("--level", type=int, default=None, help="compression level (default: gzip 6, zstd 3)")
+    parser.add_argument("--progress", action="store_true", help="show a live items/s and ETA line on stderr")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="REPORT",
+                        help="time each stage and write a JSON report (default: <output>.profile.json); "
+                             "implies --progress")
+    parser.add_argument("--profile-with", choices=["cprofile", "tracemalloc"], action="append", default=[],
+                        help="with --profile, also run the main process under cProfile (stats saved next to "
+                             "the report) or tracemalloc; repeatable")
+    parser.add_argument("--append", action="store_true",
+                        help="add --count items to the end of an existing output, continuing its model numbers")
+    parser.add_argument("--model-width", type=int, default=None,
+                        help="digits in model numbers (default: enough for --count, at least 4); "
+                             "reserve more to keep names sorted across later --append runs")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="split output into this many files of nearly equal size, plus a manifest with each "
+                             "file's item range, size and checksum")
+    parser.add_argument("--data-profile", default="default",
+                        help="named data shape: default, skewed, long-text, duplicates or adversarial "
+                             "(python engine only; see data_profiles.py)")
+    parser.add_argument("--dedupe-index", action="store_true",
+                        help="also write <output>.keys with a natural key and content hash per item, for "
+                             "one-pass insert/update/skip diffs (see dedupe_index.py)")
+    parser.add_argument("--offset-index", action="store_true",
+                        help="ndjson: also write <output>.idx with each record's byte offset (see ndjson_index.py)")
+    args = parser.parse_args(argv)
+    if args.count < 0:
+        parser.error("--count must not be negative")
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+    if args.shards > 1 and args.append:
+        parser.error("--append does not support --shards")
+
+    seed = args.seed if args.seed is not None else random.randrange(2**32)
+    state = None
+    first_index = 0
+    if args.append:
+        if not os.path.exists(args.output):
+            parser.error(f"--append: {args.output} does not exist")
+        state = read_meta(args.output) or infer_append_state(args.output)
+        if args.format and args.format != state["format"]:
+            parser.error(f"--append: {args.output} is {state['format']}, not {args.format}")
+        if args.compress is not None or args.level is not None:
+            parser.error("--append keeps the existing output's compression; drop --compress/--level")
+        if args.model_width and args.model_width != state["model_width"]:
+            parser.error(f"--append: {args.output} uses {state['model_width']}-digit model numbers")
+        args.format = state["format"]
+        first_index = state["next_index"]
+        width = state["model_width"]
+        if len(str(first_index + args.count)) > width:
+            raise SystemExit(f"Appending {args.count} items needs model numbers past {width} digits, which would "
+                             f"break name order; regenerate with a larger --model-width")
+    else:
+        args.format = args.format or "json"
+        width = args.model_width or model_width_for(args.count)
+        if len(str(args.count)) > width:
+            parser.error(f"--model-width {width} is too small for {args.count} items")
+    set_model_width(width)
+    layout = FORMATS[args.format]
+    if args.append and layout["write"] is write_columnar:
+        parser.error(f"--append does not support {args.format} output")
+    if args.data_profile != "default" and args.engine != "python":
+        parser.error("--data-profile requires --engine python")
+    set_data_profile(args.data_profile, seed)
+    if args.offset_index and args.format != "ndjson":
+        parser.error("--offset-index requires --format ndjson")
+    # Full price/quantity statistics are only kept when they will be saved
+    stats = aggregates.Aggregates() if args.aggregates else aggregates.CategoryCounts()
+    get_shard_items(args.engine)
+    options = {}
+    if args.format == "bson":
+        options = bson_writer.document_options(args.created_by, args.time_window_days, args.time_end)
+    if args.append:
+        codec = state["compress"]
+        args.level = state["level"]
+    else:
+        codec = codec_for_path(args.output) if args.compress is None else args.compress
+    if codec and codec != "none":
+        if layout["write"] is write_columnar:
+            parser.error(f"--format {args.format} is compressed internally; --compress does not apply")
+        if args.offset_index:
+            parser.error("--offset-index needs uncompressed output")
+        if codec == "zstd":
+            load_zstd()
+        options.update(compress=codec, level=args.level)
+    options["model_width"] = width
+    if args.aggregates:
+        options["aggregates"] = True
+    options["data_profile"] = args.data_profile
+    if args.dedupe_index:
+        options["dedupe"] = True
+        import dedupe_index
+    if args.append:
+        options["append"] = True
+    profile = args.profile is not None or bool(args.profile_with)
+    if profile:
+        options["profile"] = True
+    timers = profiling.StageTimers()
+    progress = profiling.Progress(args.count) if args.progress or profile else None
+    raw_bytes = 0
+    done = 0
+    key_runs = []
+
+    def chunks(begin, end, existing=range(0)):
+        # Encoded chunks for the sample items at the `existing` positions,
+        # then new item indexes begin..end-1
+        nonlocal raw_bytes, done
+        if existing:
+            # As in encode_shard, earlier sample items are prepared but not
+            # encoded, so bson fields match the unsharded output
+            keys = [] if args.dedupe_index else None
+            wanted = tally_keys(existing_items[existing.start:existing.stop], keys, existing.start)
+            items = chain(existing_items[:existing.start], aggregates.tally(wanted, stats))
+            if profile:
+                chunk = profiled_encode(args.format, items, seed, 0, options, timers, existing.start)
+            else:
+                chunk = encode_items(args.format, items, seed, 0, options, existing.start)
+            raw_bytes += getattr(chunk, "raw_size", 0)
+            if keys is not None:
+                key_runs.append(pack_keys(keys))
+            yield chunk
+        encoded = iter_encoded_shards(args.format, end, seed, args.workers, args.engine, options, begin)
+        for shard, (chunk, shard_stats, shard_timers, shard_keys) in zip(range(begin // SHARD_SIZE, shard_count(end)),
+                                                                         encoded):
+            stats.merge(shard_stats)
+            if shard_keys is not None:
+                key_runs.append(shard_keys)
+            if shard_timers is not None:
+                timers.merge(shard_timers)
+            raw_bytes += getattr(chunk, "raw_size", 0)
+            if progress is not None:
+                done = min(end, (shard + 1) * SHARD_SIZE) - first_index
+                progress.update(done)
+            yield chunk
+
+    if args.shards > 1:
+        # Output positions are split evenly, sample items included, so the
+        # first files hold the sample items (possibly spread over several)
+        # and a few fewer new ones
+        existing = len(existing_items)
+        ranges = shard_manifest.balanced_ranges(existing + args.count, args.shards)
+        outputs = [(shard_manifest.shard_path(args.output, i, args.shards), first, end)
+                   for i, (first, end) in enumerate(ranges)]
+        jobs = [(path, chunks(max(0, first - existing), max(0, end - existing), range(first, min(end, existing))))
+                for path, first, end in outputs]
+    else:
+        sample = range(0 if args.append else len(existing_items))
+        jobs = [(args.output, chunks(first_index, first_index + args.count, sample))]
+
+    produce = profiling.StageTimers()
+    if profile:
+        # Whatever isn't spent producing chunks is spent writing them
+        jobs = [(path, profiling.timed_iter(source, produce, "produce")) for path, source in jobs]
+        report_path = args.profile or args.output + ".profile.json"
+        profiler = profiling.start_tracers(args.profile_with)
+    size_before = 0
+    if args.append:
+        # Only the footer is rewritten; earlier items are never read
+        truncate_footer(args.output, encoded_footer(args.format, options.get("compress"), options.get("level")))
+        size_before = os.path.getsize(args.output)
+    start = time.perf_counter()
+    for path, source in jobs:
+        if args.offset_index:
+            offsets = array("Q", [size_before])
+            source = ndjson_index.record_offsets(source, offsets)
+        layout["write"](source, path, args.format, options)
+        if args.offset_index:
+            # Written after the data, so an index never points past the file's end
+            if args.append and os.path.exists(ndjson_index.index_path(path)):
+                ndjson_index.extend_index(ndjson_index.index_path(path), offsets)
+            elif args.append:
+                # No index for the existing items yet; index the whole file once
+                ndjson_index.build_index(path)
+            else:
+                ndjson_index.save_index(offsets, ndjson_index.index_path(path))
+    if args.dedupe_index:
+        # Positions run across all --shards files, so there is one index
+        keys = dedupe_index.keys_path(args.output)
+        if args.append and os.path.exists(keys):
+            dedupe_index.extend_keys(keys, key_runs)
+        elif args.append:
+            dedupe_index.build([args.output], keys)
+        else:
+            dedupe_index.save_keys(key_runs, keys)
+    elapsed = time.perf_counter() - start
+    if progress is not None:
+        progress.finish(done)
+    if profile:
+        traced = profiling.stop_tracers(args.profile_with, profiler, os.path.splitext(report_path)[0] + ".prof")
+        producing = produce.seconds.get("produce", 0.0)
+        timers.add("write", elapsed - producing)
+        if args.workers > 1:
+            timers.add("wait", producing)
+
+    total = (state["items"] if args.append else len(existing_items))
+    total = None if total is None else total + args.count
+    runs = (state["runs"] if args.append else []) + [
+        {"seed": seed, "engine": args.engine, "data_profile": args.data_profile, "first_index": first_index,
+         "count": args.count}]
+    meta = {
+        "version": META_VERSION, "format": args.format, "compress": options.get("compress"),
+        "level": options.get("level"), "model_width": width, "items": total,
+        "next_index": first_index + args.count, "runs": runs,
+    }
+    if args.shards > 1:
+        manifest = shard_manifest.manifest_path(args.output)
+        base_dir = os.path.dirname(os.path.abspath(manifest))
+        shard_manifest.save({
+            **meta, "version": shard_manifest.VERSION,
+            "shards": [shard_manifest.shard_entry(path, first, end, base_dir) for path, first, end in outputs],
+        }, manifest)
+    else:
+        write_meta(args.output, meta)
+
+    if args.append:
+        print(f"Appended {args.count} new items as model numbers {first_index + 1:0{width}d}-"
+              f"{first_index + args.count:0{width}d} (seed {seed}, {args.engine} engine)")
+    else:
+        print(f"Generated {args.count} new items (seed {seed}, {args.engine} engine, {args.data_profile} profile)")
+    print(f"Elapsed: {elapsed:.2f}s ({args.count / elapsed if elapsed else 0:,.0f} items/s)")
+    print(f"Total items: {total if total is not None else 'unknown (no metadata before this run)'}")
+    print(f"Categories covered: {len(categories)}")
+    if args.shards > 1:
+        sizes = [os.path.getsize(path) for path, _, _ in outputs]
+        print(f"Shards: {args.shards} files of {min(sizes) / 1e6:.1f}-{max(sizes) / 1e6:.1f}MB, "
+              f"manifest {manifest}")
+    if options.get("compress"):
+        # Item data only; the few bytes of array brackets and separators are left out
+        size = sum(os.path.getsize(path) for path, _ in jobs) - size_before
+        print(f"Compression: {options['compress']}, {raw_bytes / 1e6:.1f}MB -> {size / 1e6:.1f}MB "
+              f"({raw_bytes / size if size else 0:.2f}x), {raw_bytes / 1e6 / elapsed if elapsed else 0:.1f} MB/s")
 
-# Combine with existing items
-all_items = existing_items + new_items
+    print("\nCategory distribution:")
+    for cat, cat_count in sorted(stats.counts().items()):
+        print(f"  {cat}: {cat_count}")
 
-# Write to file
-with open('sample-data/items.json', 'w') as f:
-    json.dump(all_items, f, indent=2)
+    if args.aggregates:
+        if args.append and os.path.exists(args.aggregates):
+            stats.merge(aggregates.load(args.aggregates))
+        aggregates.save(stats, args.aggregates)
+        print(f"\nAggregates written to {args.aggregates}")
 
-print(f"Generated {len(new_items)} new items")
-print(f"Total items: {len(all_items)}")
-print(f"Categories covered: {len(categories)}")
+    if profile:
+        run_info = {"format": args.format, "engine": args.engine, "data_profile": args.data_profile,
+                    "workers": args.workers,
+                    "compress": options.get("compress"), "seed": seed}
+        report = profiling.build_report(timers, args.count, elapsed, run_info, traced)
+        profiling.save_report(report, report_path)
+        profiling.print_report(report)
+        print(f"\nProfile report written to {report_path}")
 
-# Show category distribution
-category_counts = {}
-for item in all_items:
-    cat = item["category"]
-    category_counts[cat] = category_counts.get(cat, 0) + 1
 
-print("\nCategory distribution:")
-for cat, count in sorted(category_counts.items()):
-    print(f"  {cat}: {count}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+User Generator
+
+Generates large user sets with already-hashed passwords, ready for bulk
+loading with mongoimport or mongorestore. Loading them this way never runs
+the UserSchema pre('save') bcrypt hook, and import-data.ts, which does,
+must not be pointed at this output.
+
+Hashes are bcrypt with the same cost (10) and `$2a$` prefix that bcryptjs
+produces, so comparePassword() accepts them. Passwords are drawn from a
+pool, and each distinct password is hashed only once, spread across a
+process pool. Users sharing a password therefore share a hash (and salt),
+which is fine for sample data but not for real accounts.
+
+The users in sample-data/users.json come first, so the documented logins
+keep working. The first admin's _id is printed for use as
+generate_items.py --created-by.
+
+Usage:
+  python scripts/generate_users.py --count 100000 --workers 8    # -> sample-data/users.bulk.json
+  python scripts/generate_users.py --count 100000 --format bson -o dump/nextcrud/users.bson
+  mongoimport --db nextcrud --collection users --jsonArray sample-data/users.bulk.json
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import bson_writer
+
+SAMPLE_USERS_PATH = os.path.join(os.path.dirname(__file__), "..", "sample-data", "users.json")
+ROUNDS = 10
+
+first_names = ["alice", "bob", "charlie", "diana", "ethan", "fiona", "george", "hannah", "ivan", "julia",
+               "kevin", "laura", "mike", "nina", "oscar", "paula", "quentin", "rachel", "sam", "tina"]
+last_names = ["smith", "jones", "brown", "taylor", "wilson", "davies", "evans", "thomas", "roberts", "walker",
+              "wright", "green", "hall", "wood", "clarke", "hughes", "lewis", "martin", "baker", "young"]
+password_words = ["sunset", "coffee", "dragon", "summer", "monkey", "shadow", "river", "tiger", "silver", "orange"]
+
+
+def load_bcrypt():
+    try:
+        import bcrypt
+    except ImportError as exc:
+        raise SystemExit(f"generate_users.py requires bcrypt ({exc})")
+    return bcrypt
+
+
+def hash_password(password, rounds=ROUNDS):
+    bcrypt = load_bcrypt()
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds, prefix=b"2a")).decode()
+
+
+def hash_passwords(passwords, rounds=ROUNDS, workers=1):
+    # Hashes each distinct password once; returns {password: hash}
+    distinct = list(dict.fromkeys(passwords))
+    if workers <= 1:
+        return {password: hash_password(password, rounds) for password in distinct}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        hashes = pool.map(hash_password, distinct, [rounds] * len(distinct), chunksize=4)
+        return dict(zip(distinct, hashes))
+
+
+def load_sample_users(path=SAMPLE_USERS_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def generate_users(count, seed, admin_share=0.05, distinct_passwords=100):
+    # Plaintext users: sample users first, then `count` generated ones
+    rng = random.Random(seed)
+    pool = [f"{rng.choice(password_words)}{rng.randint(100, 999)}" for _ in range(distinct_passwords)]
+    users = [dict(user, email=user["email"].strip().lower()) for user in load_sample_users()]
+    for i in range(count):
+        users.append({
+            "email": f"{rng.choice(first_names)}.{rng.choice(last_names)}.{i + 1}@example.com",
+            "password": rng.choice(pool),
+            "role": "admin" if rng.random() < admin_share else "viewer",
+        })
+    return users
+
+
+def to_documents(users, hashes, seed, end=None, window_days=365):
+    # Shapes users like User.create() stores them, with ids in createdAt order
+    digest = hashlib.sha256(f"{seed}:users".encode()).digest()
+    rng = random.Random(int.from_bytes(digest[:8], "big"))
+    end = end or datetime.now(timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    window_ms = int(window_days * 86400 * 1000)
+    created = sorted(end - timedelta(milliseconds=int(rng.random() * window_ms)) for _ in users)
+    for number, (user, created_at) in enumerate(zip(users, created)):
+        created_at = created_at.replace(microsecond=created_at.microsecond // 1000 * 1000)
+        yield {
+            "_id": bson_writer.make_object_id(int(created_at.timestamp()), digest[8], number),
+            "email": user["email"],
+            "password": hashes[user["password"]],
+            "role": user["role"],
+            "createdAt": created_at,
+            "__v": 0,
+        }
+
+
+def to_extended_json(doc):
+    # MongoDB Extended JSON, as mongoimport expects
+    out = {}
+    for key, value in doc.items():
+        if isinstance(value, bson_writer.ObjectId):
+            value = {"$oid": value.hex()}
+        elif isinstance(value, datetime):
+            value = {"$date": value.isoformat(timespec="milliseconds").replace("+00:00", "Z")}
+        out[key] = value
+    return out
+
+
+def write_documents(docs, path, fmt):
+    if fmt == "bson":
+        with open(path, 'wb') as f:
+            for doc in docs:
+                f.write(bson_writer.encode_document(doc))
+        return
+    with open(path, 'w') as f:
+        if fmt == "ndjson":
+            for doc in docs:
+                f.write(json.dumps(to_extended_json(doc)) + "\n")
+        else:
+            json.dump([to_extended_json(doc) for doc in docs], f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate sample users with pre-hashed bcrypt passwords.")
+    parser.add_argument("--count", type=int, default=1000, help="number of users to generate")
+    parser.add_argument("--format", choices=["json", "ndjson", "bson"], default="json",
+                        help="json array or ndjson for mongoimport (Extended JSON), or bson for mongorestore")
+    parser.add_argument("-o", "--output", default="sample-data/users.bulk.json", help="output file path")
+    parser.add_argument("--seed", type=int, default=0, help="seed for reproducible users")
+    parser.add_argument("--admin-share", type=float, default=0.05, help="share of generated users with the admin role")
+    parser.add_argument("--distinct-passwords", type=int, default=100,
+                        help="size of the password pool generated users draw from")
+    parser.add_argument("--rounds", type=int, default=ROUNDS, help="bcrypt cost factor (UserSchema uses 10)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="hashing processes")
+    parser.add_argument("--time-end", type=datetime.fromisoformat, default=None,
+                        help="newest createdAt as an ISO timestamp (default: now, UTC)")
+    parser.add_argument("--credentials", default=None,
+                        help="also write email,password,role in plaintext to this CSV (for login load tests)")
+    args = parser.parse_args(argv)
+
+    if not 0 <= args.admin_share <= 1:
+        parser.error("--admin-share must be between 0 and 1")
+    if args.distinct_passwords < 1:
+        parser.error("--distinct-passwords must be at least 1")
+    load_bcrypt()
+
+    users = generate_users(args.count, args.seed, args.admin_share, args.distinct_passwords)
+    start = time.perf_counter()
+    hashes = hash_passwords([user["password"] for user in users], args.rounds, args.workers)
+    hash_time = time.perf_counter() - start
+
+    docs = list(to_documents(users, hashes, args.seed, args.time_end))
+    write_documents(docs, args.output, args.format)
+    if args.credentials:
+        with open(args.credentials, 'w', newline="") as f:
+            writer = csv.DictWriter(f, ["email", "password", "role"], lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(users)
+
+    admins = [doc for doc in docs if doc["role"] == "admin"]
+    print(f"Generated {len(users)} users ({len(admins)} admin, {len(users) - len(admins)} viewer) "
+          f"-> {args.output}")
+    print(f"Hashed {len(hashes)} distinct passwords for {len(users)} users in {hash_time:.2f}s "
+          f"({len(hashes) / hash_time if hash_time else 0:.1f} hashes/s, {args.workers} workers, cost {args.rounds})")
+    if admins:
+        print(f"First admin: {admins[0]['email']} (_id {admins[0]['_id'].hex()}); "
+              f"pass --created-by {admins[0]['_id'].hex()} to generate_items.py")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Workload Generator
+
+Generates a request mix for the items API as JSON lines, one request per
+line. Search terms and categories come from the same vocabularies as
+generate_items.py and are drawn from Zipfian distributions, so a few hot
+terms dominate the way real traffic does instead of uniform noise.
+
+Each GET request mirrors what components/ItemList.tsx sends to
+GET /api/items: an optional `search` string and zero or more repeated
+`category` params. Writes reference catalog items by their position
+(`item`), which the replay tool maps to real ids.
+
+Usage:
+  python scripts/generate_workload.py                          # 10000 requests -> sample-data/requests.jsonl
+  python scripts/generate_workload.py --count 100000 --search-only 0.5 --combined 0.2 --put 0.1
+"""
+import argparse
+import bisect
+import itertools
+import json
+import random
+
+import generate_items as gi
+
+ITEMS_PATH = "/api/items"
+
+# GET request shapes, named by which filters are present
+SHAPES = ["unfiltered", "category", "search", "search+category"]
+
+
+def search_vocabulary():
+    terms = list(gi.categories) + list(gi.adjectives)
+    for templates in gi.product_templates.values():
+        for name_template, _, _, _ in templates:
+            name = name_template.replace("{}", "").strip()
+            if name:
+                terms.append(name)
+    for values in gi.specs.values():
+        terms.extend(str(value) for value in values)
+    # Drop duplicates but keep first-seen order so ranks are stable
+    return list(dict.fromkeys(terms))
+
+
+class Zipf:
+    # Rank k (1-based) is drawn with probability proportional to 1 / k**s
+
+    def __init__(self, values, s, rng):
+        self.values = list(values)
+        rng.shuffle(self.values)
+        self.cum_weights = list(itertools.accumulate(1 / k ** s for k in range(1, len(self.values) + 1)))
+
+    def sample(self, rng):
+        x = rng.random() * self.cum_weights[-1]
+        return self.values[bisect.bisect(self.cum_weights, x)]
+
+
+def request_shape(query):
+    search = bool(query.get("search"))
+    category = bool(query.get("category"))
+    if search and category:
+        return "search+category"
+    if search:
+        return "search"
+    if category:
+        return "category"
+    return "unfiltered"
+
+
+def typed_search(term, rng, prefix_rate):
+    # Users mostly type lowercase, and sometimes pause mid-word long enough
+    # for the 400ms debounce to fire on a prefix
+    if rng.random() < 0.7:
+        term = term.lower()
+    if len(term) > 3 and rng.random() < prefix_rate:
+        term = term[:rng.randint(2, len(term) - 1)]
+    return term
+
+
+def generate_requests(count, seed, mix, catalog_size, zipf_s=1.1, prefix_rate=0.2):
+    rng = random.Random(seed)
+    terms = Zipf(search_vocabulary(), zipf_s, rng)
+    categories = Zipf(gi.categories, zipf_s, rng)
+    kinds = list(mix)
+    cum_weights = list(itertools.accumulate(mix.values()))
+
+    for seq in range(count):
+        kind = rng.choices(kinds, cum_weights=cum_weights)[0]
+        record = {"seq": seq}
+
+        if kind in SHAPES:
+            query = {}
+            if "search" in kind:
+                query["search"] = typed_search(terms.sample(rng), rng, prefix_rate)
+            if "category" in kind:
+                # Usually one category, occasionally a few
+                picked = {categories.sample(rng) for _ in range(1 + int(rng.expovariate(2.0)))}
+                query["category"] = sorted(picked)
+            record.update(method="GET", path=ITEMS_PATH, query=query, shape=kind)
+        elif kind == "post":
+            category = categories.sample(rng)
+            record.update(method="POST", path=ITEMS_PATH, shape="post",
+                          body=gi.generate_item(category, catalog_size + seq, rng))
+        elif kind == "put":
+            record.update(method="PUT", path=ITEMS_PATH, shape="put", item=rng.randrange(catalog_size),
+                          body={"quantity": rng.randint(0, 500), "price": round(rng.uniform(1, 3000), 2)})
+        else:
+            record.update(method="DELETE", path=ITEMS_PATH, shape="delete", item=rng.randrange(catalog_size))
+        yield record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a request workload for the items API.")
+    parser.add_argument("--count", type=int, default=10000, help="number of requests")
+    parser.add_argument("-o", "--output", default="sample-data/requests.jsonl", help="output file path")
+    parser.add_argument("--seed", type=int, default=0, help="seed for reproducible output")
+    parser.add_argument("--catalog-size", type=int, default=len(gi.existing_items) + 5000,
+                        help="number of items the workload's writes may target")
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent for search terms and categories")
+    parser.add_argument("--prefix-rate", type=float, default=0.2, help="share of searches cut to a typed prefix")
+    mix = parser.add_argument_group("request mix (relative weights)")
+    mix.add_argument("--unfiltered", type=float, default=0.10, help="GET with no filters")
+    mix.add_argument("--category-only", type=float, default=0.25, help="GET with category params only")
+    mix.add_argument("--search-only", type=float, default=0.35, help="GET with a search term only")
+    mix.add_argument("--combined", type=float, default=0.15, help="GET with search and category")
+    mix.add_argument("--post", type=float, default=0.03, help="POST new item")
+    mix.add_argument("--put", type=float, default=0.10, help="PUT quantity/price change")
+    mix.add_argument("--delete", type=float, default=0.02, help="DELETE item")
+    args = parser.parse_args(argv)
+
+    weights = {
+        "unfiltered": args.unfiltered,
+        "category": args.category_only,
+        "search": args.search_only,
+        "search+category": args.combined,
+        "post": args.post,
+        "put": args.put,
+        "delete": args.delete,
+    }
+    if any(weight < 0 for weight in weights.values()) or not sum(weights.values()):
+        parser.error("request mix weights must be non-negative and not all zero")
+
+    counts = {}
+    with open(args.output, 'w') as f:
+        for record in generate_requests(args.count, args.seed, weights, args.catalog_size,
+                                        args.zipf_s, args.prefix_rate):
+            counts[record["shape"]] = counts.get(record["shape"], 0) + 1
+            f.write(json.dumps(record) + "\n")
+
+    print(f"Wrote {args.count} requests to {args.output}")
+    print("\nRequest mix:")
+    for shape, count in sorted(counts.items(), key=lambda kv: -kv[1]):
+        print(f"  {shape}: {count} ({count / args.count:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Index Advisor
+
+Costs the candidate access paths for GET /api/items against a generated
+catalog and a workload from generate_workload.py, fully offline, and
+recommends an index set for models/Item.ts.
+
+Every GET sorts on { createdAt: -1 }. Search is an unanchored
+case-insensitive $regex over name, description and category, and category
+filters are $in lists of case-insensitive RegExps. Neither kind of regex
+gives tight index bounds, so a B-tree index on category is scanned in full,
+with the regex applied to its keys. Candidate plans:
+
+  COLLSCAN                   fetch every document, then a blocking in-memory sort
+  createdAt_-1               walk the index in sort order, fetch every document, no sort
+  category_1                 scan every key, fetch documents whose category matches, sort
+  category_1_createdAt_-1    as category_1: regex bounds rule out a sort-ordered walk
+  createdAt_-1_category_1    walk in sort order, filter category on the keys, fetch matches, no sort
+  trigram                    fetch candidates from trigram posting lists, sort (literal searches
+                             of 3+ characters only; see trigram_index.py)
+
+A MongoDB $text index is not a candidate: it matches stemmed words, not the
+substrings the route's $regex matches.
+
+With --exact-category, category filters are costed as exact $in matches
+(point bounds). The route only gets those if it stops sending
+case-insensitive RegExps, for example by storing a normalized category.
+Category indexes then only touch matching keys, and category_1_createdAt_-1
+merges the per-category runs in sort order.
+
+Costs are in rough relative units: each key examined costs --key-cost, each
+document fetched --doc-cost, and each in-memory sort comparison --sort-cost.
+Every index a POST or DELETE has to maintain costs --write-cost per key.
+Catalog position stands in for createdAt, as in trigram_index.py.
+
+Usage:
+  python scripts/index_advisor.py sample-data/items.json --requests sample-data/requests.jsonl
+  python scripts/index_advisor.py items.ndjson --exact-category --report advice.json
+"""
+import argparse
+import itertools
+import json
+import math
+import re
+from collections import Counter
+
+from generate_items import load_items
+from generate_workload import SHAPES
+from trigram_index import FIELDS, REGEX_SYNTAX, TrigramIndex, indexed_search, normalize_query, trigrams
+
+INDEXES = ["createdAt_-1", "category_1", "category_1_createdAt_-1", "createdAt_-1_category_1", "trigram"]
+SORT_MEMORY_LIMIT = 100 * 1024 * 1024
+
+
+class CostModel:
+    def __init__(self, key_cost=1.0, doc_cost=10.0, sort_cost=1.0, write_cost=20.0):
+        self.key_cost = key_cost
+        self.doc_cost = doc_cost
+        self.sort_cost = sort_cost
+        self.write_cost = write_cost
+
+    def plan_cost(self, plan):
+        return (plan["keys_examined"] * self.key_cost + plan["docs_examined"] * self.doc_cost
+                + plan["sort_comparisons"] * self.sort_cost)
+
+
+def sort_comparisons(n, runs=1):
+    # Blocking sort of n documents, or a k-way merge of already sorted runs
+    if n <= 1:
+        return 0
+    return n * math.log2(min(n, runs)) if runs > 1 else n * math.log2(n)
+
+
+def plan(keys, docs, sorted_docs=0, runs=1):
+    return {"keys_examined": keys, "docs_examined": docs, "sort_comparisons": sort_comparisons(sorted_docs, runs)}
+
+
+class Catalog:
+    # Per-query match counts over the generated items, cached by query
+    def __init__(self, items):
+        self.items = items
+        self.count = len(items)
+        self.category_counts = Counter(item["category"] for item in items)
+        self.index = TrigramIndex.from_items(items)
+        self.avg_doc_bytes = sum(len(json.dumps(item)) for item in items) / max(self.count, 1)
+        # Distinct trigrams per item: keys a trigram index maintains per insert
+        self.avg_trigrams = sum(count for count, _ in self.index.terms.values()) / max(self.count, 1)
+        # Lowercased fields joined by a byte no literal search contains, so a
+        # substring test can't match across two fields
+        self.texts = ["\0".join(item[field] for field in FIELDS).lower() for item in items]
+        self._cache = {}
+        self._search_cache = {}
+
+    def matching_categories(self, categories, exact):
+        # Distinct category values the filter keeps
+        if exact:
+            return {value for value in self.category_counts if value in categories}
+        regexes = [re.compile(c, re.IGNORECASE) for c in categories]
+        return {value for value in self.category_counts if any(r.search(value) for r in regexes)}
+
+    def search_matches(self, search):
+        # Ids matching the search alone; category filters are applied on top,
+        # so each distinct search is only evaluated once
+        if search not in self._search_cache:
+            if REGEX_SYNTAX & set(search) or "\0" in search:
+                matches = indexed_search(self.index, self.items, search)
+            else:
+                # A literal case-insensitive regex is a substring test on lowercased text
+                needle = search.lower()
+                candidates = self.index.candidates(search)
+                ids = range(self.count - 1, -1, -1) if candidates is None else sorted(candidates, reverse=True)
+                matches = [i for i in ids if needle in self.texts[i]]
+            self._search_cache[search] = matches
+        return self._search_cache[search]
+
+    def plans(self, search, categories, exact=False):
+        # Candidate plans for one GET, or None when the route would fail (invalid regex)
+        search, categories = normalize_query(search, categories)
+        key = (search, tuple(categories), exact)
+        if key not in self._cache:
+            try:
+                self._cache[key] = self._plans(search, categories, exact)
+            except re.error:
+                self._cache[key] = None
+        return self._cache[key]
+
+    def _plans(self, search, categories, exact):
+        n = self.count
+        wanted = self.matching_categories(categories, exact) if categories else None
+        category_docs = sum(self.category_counts[value] for value in wanted) if categories else n
+        if search:
+            matches = self.search_matches(search)
+            if categories:
+                matches = [i for i in matches if self.items[i]["category"] in wanted]
+            returned = len(matches)
+        else:
+            returned = category_docs
+
+        plans = {
+            "COLLSCAN": plan(0, n, returned),
+            "createdAt_-1": plan(n, n),
+            "createdAt_-1_category_1": plan(n, category_docs),
+        }
+        if categories:
+            if exact:
+                plans["category_1"] = plan(category_docs, category_docs, returned)
+                plans["category_1_createdAt_-1"] = plan(category_docs, category_docs, returned, len(wanted))
+            else:
+                plans["category_1"] = plan(n, category_docs, returned)
+                plans["category_1_createdAt_-1"] = plan(n, category_docs, returned)
+        candidates = self.index.candidates(search) if search else None
+        if candidates is not None:
+            keys = sum(len(self.index.postings(gram)) for gram in trigrams(search.lower()))
+            plans["trigram"] = plan(keys, len(candidates), returned)
+        for entry in plans.values():
+            entry["returned"] = returned
+        return plans
+
+
+def load_workload(path, limit=None):
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return records[:limit] if limit else records
+
+
+def index_uses(plan_name):
+    # Indexes a plan depends on
+    return set() if plan_name == "COLLSCAN" else {plan_name}
+
+
+def best_plan(plans, index_set, model):
+    # What the planner picks given the available indexes
+    usable = [name for name in plans if index_uses(name) <= index_set]
+    return min(usable, key=lambda name: model.plan_cost(plans[name]))
+
+
+def write_keys(index_set, catalog):
+    # Index keys a POST or DELETE inserts or removes. PUT only changes
+    # quantity and price, which no candidate indexes, so it costs nothing.
+    return sum(catalog.avg_trigrams if name == "trigram" else 1 for name in index_set)
+
+
+def analyze(catalog, workload, model, exact=False):
+    queries = Counter()
+    shape_counts = Counter()
+    invalid = Counter()
+    for record in workload:
+        shape = record.get("shape")
+        shape_counts[shape] += 1
+        if record.get("method") != "GET":
+            continue
+        query = record.get("query") or {}
+        key = (shape, query.get("search") or "", tuple(query.get("category") or []))
+        if catalog.plans(key[1], key[2], exact) is None:
+            invalid[shape] += 1
+            continue
+        queries[key] += 1
+
+    writes = shape_counts["post"] + shape_counts["delete"]
+    weighted = [(count, catalog.plans(search, categories, exact))
+                for (_, search, categories), count in queries.items()]
+
+    def total_cost(index_set):
+        reads = sum(count * model.plan_cost(plans[best_plan(plans, index_set, model)]) for count, plans in weighted)
+        return reads + writes * write_keys(index_set, catalog) * model.write_cost
+
+    index_sets = [frozenset(combo) for r in range(len(INDEXES) + 1) for combo in itertools.combinations(INDEXES, r)]
+    ranked = sorted(((total_cost(index_set), len(index_set), sorted(index_set)) for index_set in index_sets))
+
+    # Per shape, the average of each plan wherever it applies
+    shapes = {}
+    for (shape, search, categories), count in queries.items():
+        plans = catalog.plans(search, categories, exact)
+        entry = shapes.setdefault(shape, {"queries": 0, "plans": {}})
+        entry["queries"] += count
+        for name, cost in plans.items():
+            totals = entry["plans"].setdefault(name, Counter())
+            totals["queries"] += count
+            for field in ("keys_examined", "docs_examined", "sort_comparisons", "returned"):
+                totals[field] += cost[field] * count
+            totals["cost"] += model.plan_cost(cost) * count
+    for entry in shapes.values():
+        for name, totals in entry["plans"].items():
+            entry["plans"][name] = {field: totals[field] / totals["queries"]
+                                    for field in ("keys_examined", "docs_examined", "sort_comparisons", "returned",
+                                                  "cost")}
+            entry["plans"][name]["applies_to"] = totals["queries"] / entry["queries"]
+            sorted_bytes = entry["plans"][name]["returned"] * catalog.avg_doc_bytes
+            entry["plans"][name]["blocking_sort_over_limit"] = (entry["plans"][name]["sort_comparisons"] > 0
+                                                                and sorted_bytes > SORT_MEMORY_LIMIT)
+
+    return {
+        "items": catalog.count,
+        "requests": sum(shape_counts.values()),
+        "request_mix": dict(shape_counts),
+        "invalid_regex": dict(invalid),
+        "exact_category": exact,
+        "shapes": shapes,
+        "index_sets": [{"indexes": names, "size": size, "cost": cost} for cost, size, names in ranked],
+        "recommended": recommend(ranked),
+    }
+
+
+def recommend(ranked, tolerance=0.02):
+    # Smallest index set within tolerance of the cheapest one
+    best = ranked[0][0]
+    cost, _, names = min((entry for entry in ranked if entry[0] <= best * (1 + tolerance)),
+                         key=lambda entry: (entry[1], entry[0]))
+    return {"indexes": names, "cost": cost, "best_cost": best}
+
+
+def print_report(report, top=5):
+    print(f"Items: {report['items']:,}, requests: {report['requests']:,}"
+          f"{' (exact category matching)' if report['exact_category'] else ''}")
+    if report["invalid_regex"]:
+        print(f"Skipped invalid regex searches (route returns 500): {report['invalid_regex']}")
+    for shape in SHAPES:
+        entry = report["shapes"].get(shape)
+        if not entry:
+            continue
+        print(f"\n{shape} ({entry['queries']:,} queries)")
+        print(f"  {'plan':<25} {'applies':>8} {'keys':>10} {'docs':>10} {'sort cmp':>11} {'returned':>9} {'cost':>11}")
+        for name, stats in sorted(entry["plans"].items(), key=lambda kv: kv[1]["cost"]):
+            flag = "  (blocking sort over 100MB)" if stats["blocking_sort_over_limit"] else ""
+            print(f"  {name:<25} {stats['applies_to']:>8.0%} {stats['keys_examined']:>10,.0f} "
+                  f"{stats['docs_examined']:>10,.0f} {stats['sort_comparisons']:>11,.0f} "
+                  f"{stats['returned']:>9,.0f} {stats['cost']:>11,.0f}{flag}")
+
+    baseline = next(entry["cost"] for entry in report["index_sets"] if not entry["indexes"])
+    print(f"\nCheapest index sets (workload total; no indexes: {baseline:,.0f}):")
+    for entry in report["index_sets"][:top]:
+        print(f"  {entry['cost']:>14,.0f}  {', '.join(entry['indexes']) or '(none)'}")
+    recommended = report["recommended"]
+    print(f"\nRecommended: {', '.join(recommended['indexes']) or 'no indexes'} "
+          f"({baseline / recommended['cost'] if recommended['cost'] else 0:.1f}x cheaper than no indexes)")
+    for name in recommended["indexes"]:
+        if name == "trigram":
+            print("  trigram: not a MongoDB index; serve literal searches from a trigram or n-gram search index")
+        else:
+            fields = ", ".join(f"{field}: {direction}" for field, direction in
+                               (part.rsplit("_", 1) for part in split_index_name(name)))
+            print(f"  ItemSchema.index({{ {fields} }});")
+
+
+def split_index_name(name):
+    parts = name.split("_")
+    return ["_".join(parts[i:i + 2]) for i in range(0, len(parts), 2)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cost candidate indexes for the items API workload.")
+    parser.add_argument("items", nargs="?", default="sample-data/items.json", help="items file (json or ndjson)")
+    parser.add_argument("--requests", default="sample-data/requests.jsonl", help="workload from generate_workload.py")
+    parser.add_argument("--limit", type=int, default=None, help="only use the first N requests")
+    parser.add_argument("--exact-category", action="store_true",
+                        help="cost category filters as exact $in matches instead of case-insensitive regexes")
+    parser.add_argument("--key-cost", type=float, default=1.0, help="cost per index key examined")
+    parser.add_argument("--doc-cost", type=float, default=10.0, help="cost per document fetched")
+    parser.add_argument("--sort-cost", type=float, default=1.0, help="cost per in-memory sort comparison")
+    parser.add_argument("--write-cost", type=float, default=20.0, help="cost per index key a write maintains")
+    parser.add_argument("--report", default=None, help="also write the full analysis as JSON")
+    args = parser.parse_args(argv)
+
+    model = CostModel(args.key_cost, args.doc_cost, args.sort_cost, args.write_cost)
+    catalog = Catalog(load_items(args.items))
+    report = analyze(catalog, load_workload(args.requests, args.limit), model, args.exact_category)
+    print_report(report)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
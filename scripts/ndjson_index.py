@@ -0,0 +1,218 @@
+"""
+NDJSON Offset Index
+
+A binary sidecar (<file>.idx) holding the byte offset of every record in an
+NDJSON file, so any record can be read without parsing what comes before
+it. The layout is a 16-byte header (magic, record count) followed by
+count + 1 little-endian uint64 offsets. The last offset is the file size,
+so record k is the bytes offsets[k]:offsets[k + 1].
+
+generate_items.py --offset-index writes the sidecar while it writes ndjson
+output and extends it on --append; `build` creates one for any existing
+NDJSON file. IndexedNDJSON memory-maps the data file and the index, and
+decodes only the records asked for, and chunks() splits the file into byte ranges on record
+boundaries for parallel scans.
+
+Usage:
+  python scripts/generate_items.py --count 10000000 --format ndjson --offset-index -o items.ndjson
+  python scripts/ndjson_index.py build items.ndjson
+  python scripts/ndjson_index.py get items.ndjson 0 5000000 9999999
+  python scripts/ndjson_index.py chunks items.ndjson --parts 8
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+MAGIC = b"NDJSONIX"
+HEADER = struct.Struct("<8sQ")
+OFFSET = struct.Struct("<Q")
+
+
+def index_path(path):
+    return path + ".idx"
+
+
+def to_little_endian(offsets):
+    if sys.byteorder == "big":
+        offsets = array("Q", offsets)
+        offsets.byteswap()
+    return offsets
+
+
+def record_offsets(chunks, offsets):
+    # Passes ndjson chunks through while appending the end offset of each
+    # line to `offsets`, which starts with the offset of the first record.
+    # json.dumps escapes non-ASCII, so string positions are byte positions.
+    for chunk in chunks:
+        base = offsets[-1]
+        pos = chunk.find("\n")
+        while pos != -1:
+            offsets.append(base + pos + 1)
+            pos = chunk.find("\n", pos + 1)
+        yield chunk
+
+
+def save_index(offsets, path):
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(offsets) - 1))
+        to_little_endian(offsets).tofile(f)
+
+
+def read_header(f, path):
+    magic, count = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise SystemExit(f"{path} is not an NDJSON offset index")
+    return count
+
+
+def extend_index(path, offsets):
+    # Appends offsets[1:] to an existing index whose last offset is offsets[0]
+    with open(path, 'r+b') as f:
+        count = read_header(f, path)
+        f.seek(HEADER.size + count * OFFSET.size)
+        (last,) = OFFSET.unpack(f.read(OFFSET.size))
+        if last != offsets[0]:
+            raise SystemExit(f"{path} ends at byte {last}, not {offsets[0]}; rebuild it with ndjson_index.py build")
+        to_little_endian(offsets[1:]).tofile(f)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, count + len(offsets) - 1))
+
+
+def build_index(path):
+    # One pass over the mapped file; an unterminated last line counts as a record
+    offsets = array("Q", [0])
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                pos = data.find(b"\n")
+                while pos != -1:
+                    offsets.append(pos + 1)
+                    pos = data.find(b"\n", pos + 1)
+    if offsets[-1] != size:
+        offsets.append(size)
+    save_index(offsets, index_path(path))
+    return len(offsets) - 1
+
+
+class IndexedNDJSON:
+    # Both the data file and the index are memory-mapped, so opening costs
+    # O(1) and reading a record touches two offsets and the record's bytes
+    def __init__(self, path):
+        self.path = path
+        self.data = b""
+        self.index_file = open(index_path(path), 'rb')
+        self.count = read_header(self.index_file, index_path(path))
+        self.index = mmap.mmap(self.index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        if size != self.offset(self.count):
+            covered = self.offset(self.count)
+            self.close()
+            raise SystemExit(f"{index_path(path)} covers {covered} bytes but {path} has {size}; "
+                             f"rebuild it with ndjson_index.py build")
+        if size:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return self.count
+
+    def offset(self, k):
+        return OFFSET.unpack_from(self.index, HEADER.size + k * OFFSET.size)[0]
+
+    def raw(self, k):
+        if not -self.count <= k < self.count:
+            raise IndexError("record index out of range")
+        k %= self.count
+        return self.data[self.offset(k):self.offset(k + 1)]
+
+    def __getitem__(self, k):
+        return json.loads(self.raw(k))
+
+    def bisect(self, target, lo, hi):
+        # Smallest record boundary k in [lo, hi] with offset(k) >= target
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.offset(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def chunks(self, parts):
+        # Splits the file into up to `parts` (start byte, end byte, first
+        # record, end record) ranges of similar size, cut between records
+        size = self.offset(self.count)
+        ranges = []
+        first = 0
+        for part in range(1, parts + 1):
+            end = self.bisect(size * part // parts, first, self.count)
+            if end > first:
+                ranges.append((self.offset(first), self.offset(end), first, end))
+                first = end
+        return ranges
+
+    def iter_range(self, first, end):
+        start = self.offset(first)
+        for k in range(first, end):
+            stop = self.offset(k + 1)
+            yield json.loads(self.data[start:stop])
+            start = stop
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.index.close()
+        self.index_file.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and read NDJSON offset indexes.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="write <file>.idx for an existing NDJSON file")
+    build.add_argument("file")
+    get = sub.add_parser("get", help="print records by position")
+    get.add_argument("file")
+    get.add_argument("records", type=int, nargs="+")
+    chunks = sub.add_parser("chunks", help="print byte ranges for a parallel scan")
+    chunks.add_argument("file")
+    chunks.add_argument("--parts", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        count = build_index(args.file)
+        print(f"Indexed {count:,} records in {time.perf_counter() - start:.2f}s -> {index_path(args.file)}")
+        return
+
+    with IndexedNDJSON(args.file) as records:
+        if args.command == "get":
+            start = time.perf_counter()
+            for k in args.records:
+                try:
+                    print(json.dumps(records[k]))
+                except IndexError:
+                    parser.error(f"record {k} is out of range ({len(records)} records)")
+            elapsed = time.perf_counter() - start
+            print(f"{len(args.records)} of {len(records):,} records in {elapsed * 1000:.2f}ms", file=sys.stderr)
+        else:
+            if args.parts < 1:
+                parser.error("--parts must be at least 1")
+            for start, end, first, stop in records.chunks(args.parts):
+                print(f"bytes {start}-{end}  records {first}-{stop - 1}  ({end - start:,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
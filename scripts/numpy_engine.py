@@ -0,0 +1,170 @@
+"""
+NumPy Batch Engine
+
+Vectorized alternative to generate_item(). Each shard draws its template
+choices, adjectives, spec slots, prices and quantities as whole arrays and
+looks names and descriptions up in a table of pre-rendered templates, so
+Python call overhead is paid per shard instead of per item.
+
+Uses the compiled template plans from generate_items.py, so vocabularies,
+slot bindings and per-template price ranges are shared with the python engine.
+Output is deterministic per (seed, shard) but is not the same item sequence
+as the random-module engine.
+
+Usage:
+  python scripts/numpy_engine.py --count 500000     # Compare items/sec against the python engine
+  python scripts/generate_items.py --engine numpy --count 1000000 -o items.json
+"""
+import argparse
+import hashlib
+import itertools
+import time
+
+import numpy as np
+
+import generate_items as gi
+
+class TemplateTable:
+    # Every template across all categories flattened into arrays indexed by
+    # global template id. Each template's names and descriptions are rendered
+    # once for every combination of slot values, so a shard is assembled by
+    # integer indexing instead of per-item formatting.
+
+    def __init__(self):
+        rows = []
+        category_offsets = []
+        category_sizes = []
+        for category in gi.categories:
+            plans = gi.template_plans[category]
+            category_offsets.append(len(rows))
+            category_sizes.append(len(plans))
+            rows.extend(plans)
+
+        slots = [self._slots(plan) for plan in rows]
+        self.name_slot_count = max(len(name_slots) for name_slots, _ in slots)
+        self.desc_slot_count = max(len(desc_slots) for _, desc_slots in slots)
+        slot_count = self.name_slot_count + self.desc_slot_count
+
+        n = len(rows)
+        self.size = np.ones((n, slot_count), dtype=np.int64)
+        self.stride = np.zeros((n, slot_count), dtype=np.int64)
+        self.is_adj = np.zeros((n, slot_count), dtype=bool)
+        self.name_offset = np.zeros(n, dtype=np.int64)
+        self.desc_offset = np.zeros(n, dtype=np.int64)
+        names = []
+        descs = []
+
+        for t, (plan, (name_slots, desc_slots)) in enumerate(zip(rows, slots)):
+            self.name_offset[t] = len(names)
+            self.desc_offset[t] = len(descs)
+            name_pools = self._bind(t, 0, name_slots)
+            desc_pools = self._bind(t, self.name_slot_count, desc_slots)
+            name_prefix = plan.name[:-len(gi.MODEL_SUFFIX)]
+            names.extend(name_prefix.format(*combo) for combo in itertools.product(*name_pools))
+            # Without an adjective slot, {0} is unused and gets a placeholder
+            lead = () if desc_slots[:1] == [gi.ADJ] else ("",)
+            descs.extend(plan.description.format(*lead, *combo) for combo in itertools.product(*desc_pools))
+
+        self.names = np.array(names, dtype=object)
+        self.descs = np.array(descs, dtype=object)
+        self.min_price = np.array([plan.min_price for plan in rows], dtype=np.float64)
+        self.max_price = np.array([plan.max_price for plan in rows], dtype=np.float64)
+        self.category_offsets = np.array(category_offsets, dtype=np.int64)
+        self.category_sizes = np.array(category_sizes, dtype=np.int64)
+
+    @staticmethod
+    def _slots(plan):
+        # Name and description slots in draw order, with ADJ where the item's
+        # adjective is used
+        desc_slots = [gi.ADJ] if "{0}" in plan.description else []
+        return [plan.name_pool], desc_slots + plan.description_pools
+
+    def _bind(self, t, first, slots):
+        # Record size/stride for slots first..first+len(slots) of template t
+        # (mixed radix, last slot fastest, matching itertools.product order)
+        pools = [gi.adjectives if pool is gi.ADJ else pool for pool in slots]
+        stride = 1
+        for s in reversed(range(len(pools))):
+            self.size[t, first + s] = len(pools[s])
+            self.stride[t, first + s] = stride
+            self.is_adj[t, first + s] = slots[s] is gi.ADJ
+            stride *= len(pools[s])
+        return pools
+
+
+_table = None
+
+
+def get_table():
+    global _table
+    if _table is None:
+        _table = TemplateTable()
+    return _table
+
+
+def shard_generator(seed, shard):
+    digest = hashlib.sha256(f"{seed}:{shard}".encode()).digest()
+    return np.random.default_rng(int.from_bytes(digest[:8], "big"))
+
+
+def shard_items(seed, shard, count, width=None):
+    # width defaults to generate_items.MODEL_WIDTH; pass it explicitly when
+    # generate_items runs as __main__, whose width this module can't see
+    table = get_table()
+    lo = shard * gi.SHARD_SIZE
+    hi = min(count, lo + gi.SHARD_SIZE)
+    n = hi - lo
+    if n <= 0:
+        return []
+    rng = shard_generator(seed, shard)
+    # Every array is drawn for a full shard and cut to n, so a shard's items
+    # don't depend on count (needed for --append and --shards)
+    full = gi.SHARD_SIZE
+    index = np.arange(lo, hi, dtype=np.int64)
+
+    cat = index % len(gi.categories)
+    tid = table.category_offsets[cat] + (rng.random(full)[:n] * table.category_sizes[cat]).astype(np.int64)
+    adj = rng.integers(0, len(gi.adjectives), full)[:n]
+    local = (rng.random((full, table.size.shape[1]))[:n] * table.size[tid]).astype(np.int64)
+    local = np.where(table.is_adj[tid], adj[:, None], local) * table.stride[tid]
+    split = table.name_slot_count
+    name = table.names[table.name_offset[tid] + local[:, :split].sum(axis=1)]
+    desc = table.descs[table.desc_offset[tid] + local[:, split:].sum(axis=1)]
+
+    low = table.min_price[tid]
+    price = np.round(low + (table.max_price[tid] - low) * rng.random(full)[:n], 2)
+    quantity = rng.integers(5, 501, full)[:n]
+
+    category_names = gi.categories
+    width = width or gi.MODEL_WIDTH
+    return [
+        {"name": f"{nm} - Model {i:0{width}d}", "description": ds, "category": category_names[c], "quantity": q, "price": p}
+        for i, nm, ds, c, q, p in zip(range(lo + 1, hi + 1), name.tolist(), desc.tolist(), cat.tolist(),
+                                      quantity.tolist(), price.tolist())
+    ]
+
+
+def measure(engine, count, seed):
+    shard_items_fn = gi.get_shard_items(engine)
+    start = time.perf_counter()
+    generated = 0
+    for shard in range(gi.shard_count(count)):
+        generated += len(list(shard_items_fn(seed, shard, count)))
+    elapsed = time.perf_counter() - start
+    return generated / elapsed if elapsed else float("inf")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare generation throughput of the python and numpy engines.")
+    parser.add_argument("--count", type=int, default=200000, help="number of items per engine")
+    parser.add_argument("--seed", type=int, default=0, help="seed for both engines")
+    args = parser.parse_args(argv)
+
+    rates = {engine: measure(engine, args.count, args.seed) for engine in ("python", "numpy")}
+    for engine, rate in rates.items():
+        print(f"  {engine:<7} {rate:>12,.0f} items/s")
+    print(f"  speedup {rates['numpy'] / rates['python']:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
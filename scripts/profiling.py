@@ -0,0 +1,175 @@
+"""
+Generation Profiling
+
+Instrumentation for generate_items.py --profile: cumulative time per stage,
+a live progress line, and a JSON report.
+
+Without --profile none of this runs and shards take the usual code path.
+With it, encoding, compression and writes are timed once per shard, and
+draws and formatting per item, in a twin of the generation loop. Worker
+processes time their own shards and send the timers back with the chunk,
+so with --workers > 1 the per-stage seconds add up time across processes
+and can exceed the wall-clock elapsed time.
+
+  draw       random.choice / uniform / randint calls in generate_item()
+  format     the name and description str.format calls
+  generate   whole-item generation, when it can't be split (numpy engine)
+  encode     serialization (json.dumps, csv, bson, ...)
+  compress   gzip/zstd block compression
+  write      output file writes in the main process
+  wait       main process waiting on workers (--workers > 1)
+
+Usage:
+  python scripts/generate_items.py --count 1000000 --profile                   # -> <output>.profile.json
+  python scripts/generate_items.py --count 1000000 --profile report.json --profile-with cprofile
+"""
+import cProfile
+import json
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+
+STAGE_ORDER = ["draw", "format", "generate", "encode", "compress", "write", "wait"]
+VERSION = 1
+
+
+class StageTimers:
+    def __init__(self):
+        self.seconds = {}
+
+    def add(self, stage, seconds):
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    def time(self, stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.add(stage, time.perf_counter() - start)
+        return result
+
+    def merge(self, other):
+        for stage, seconds in other.seconds.items():
+            self.add(stage, seconds)
+
+    def to_dict(self):
+        total = sum(self.seconds.values())
+        ordered = sorted(self.seconds, key=lambda s: STAGE_ORDER.index(s) if s in STAGE_ORDER else len(STAGE_ORDER))
+        return {
+            stage: {"seconds": round(self.seconds[stage], 4),
+                    "share": round(self.seconds[stage] / total, 4) if total else 0.0}
+            for stage in ordered
+        }
+
+
+def timed_iter(iterable, timers, stage):
+    # Charges the time spent waiting for each next() to stage
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            value = next(iterator)
+        except StopIteration:
+            timers.add(stage, time.perf_counter() - start)
+            return
+        timers.add(stage, time.perf_counter() - start)
+        yield value
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+class Progress:
+    # Single status line on stderr, redrawn at most every `interval` seconds
+
+    def __init__(self, total, stream=None, interval=0.5):
+        self.total = total
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.start = time.perf_counter()
+        self.last = 0.0
+
+    def update(self, done, force=False):
+        now = time.perf_counter()
+        if not force and now - self.last < self.interval:
+            return
+        self.last = now
+        elapsed = now - self.start
+        rate = done / elapsed if elapsed else 0
+        eta = format_duration((self.total - done) / rate) if rate else "?"
+        share = done / self.total if self.total else 1
+        self.stream.write(f"\r{done:,}/{self.total:,} items ({share:.1%})  {rate:,.0f} items/s  ETA {eta}  ")
+        self.stream.flush()
+
+    def finish(self, done):
+        self.update(done, force=True)
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KB on Linux; children covers worker processes
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(own / 1024, 1), round(children / 1024, 1)
+
+
+def start_tracers(kinds):
+    # Returns the running cProfile profiler, if one was requested
+    if "tracemalloc" in kinds:
+        tracemalloc.start()
+    if "cprofile" in kinds:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+    return None
+
+
+def stop_tracers(kinds, profiler, stats_path):
+    # Returns report fields for whatever was traced
+    extra = {}
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(stats_path)
+        extra["cprofile_stats"] = stats_path
+    if "tracemalloc" in kinds:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        extra["tracemalloc_peak_mb"] = round(peak / 1e6, 1)
+    return extra
+
+
+def build_report(timers, items, elapsed, run_info, extra=None):
+    own_rss, worker_rss = peak_rss_mb()
+    report = {
+        "version": VERSION,
+        **run_info,
+        "items": items,
+        "elapsed_s": round(elapsed, 4),
+        "items_per_sec": round(items / elapsed if elapsed else 0),
+        "stages": timers.to_dict(),
+        "peak_rss_mb": own_rss,
+        "peak_worker_rss_mb": worker_rss,
+    }
+    report.update(extra or {})
+    return report
+
+
+def print_report(report):
+    print("\nStage profile:")
+    for stage, entry in report["stages"].items():
+        print(f"  {stage:<9} {entry['seconds']:>9.3f}s {entry['share']:>7.1%}")
+    print(f"Peak RSS: {report['peak_rss_mb']}MB (workers: {report['peak_worker_rss_mb']}MB)")
+    if "tracemalloc_peak_mb" in report:
+        print(f"Peak traced Python memory (main process): {report['tracemalloc_peak_mb']}MB")
+    if "cprofile_stats" in report:
+        print(f"\ncProfile of the main process, saved to {report['cprofile_stats']}:")
+        pstats.Stats(report["cprofile_stats"], stream=sys.stdout).sort_stats("cumulative").print_stats(10)
+
+
+def save_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,451 @@
+"""
+Workload Replay
+
+Replays a request log from generate_workload.py against the items API with
+asyncio and reports latency percentiles, throughput and error rates per
+request shape (unfiltered, category, search, search+category, post, put,
+delete).
+
+Two load models are supported:
+  - open loop: requests are released at a fixed arrival rate regardless of
+    how fast responses come back. Latency is measured from the scheduled
+    send time, so queueing delay is not hidden (no coordinated omission).
+  - closed loop: N clients each send a request and wait for its response
+    before sending the next one.
+
+--stub starts a local stand-in for app/api/items/route.ts in a separate
+process, serving an in-memory catalog with the same filter and sort
+semantics. No MongoDB or external network is needed.
+
+Usage:
+  python scripts/replay_workload.py --stub --clients 16                 # Closed loop against the stub
+  python scripts/replay_workload.py --stub --rate 200 --report out.json # Open loop, 200 req/s
+  python scripts/replay_workload.py --url http://localhost:3000 --token <jwt> --clients 8
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import re
+import sys
+import time
+from collections import Counter
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from generate_items import load_items
+from generate_workload import SHAPES
+
+
+class LatencyHistogram:
+    # HDR-style log-linear histogram of integer microseconds. Values share a
+    # bucket only when they agree in their top SUB_BUCKET_BITS bits, which
+    # keeps about three significant digits at every magnitude.
+    SUB_BUCKET_BITS = 11
+
+    def __init__(self):
+        self.counts = Counter()
+        self.total = 0
+        self.max = 0
+
+    def _key(self, value):
+        shift = max(value.bit_length() - self.SUB_BUCKET_BITS, 0)
+        return shift, value >> shift
+
+    def record(self, seconds):
+        value = max(int(seconds * 1e6), 0)
+        self.counts[self._key(value)] += 1
+        self.total += 1
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p):
+        # Highest value equivalent to the bucket holding the p-th percentile
+        if not self.total:
+            return 0.0
+        target = max(1, round(p / 100 * self.total))
+        seen = 0
+        for shift, sub in sorted(self.counts):
+            seen += self.counts[(shift, sub)]
+            if seen >= target:
+                return min((((sub + 1) << shift) - 1), self.max) / 1e6
+        return self.max / 1e6
+
+
+class ShapeStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.statuses = Counter()
+
+    @property
+    def errors(self):
+        return sum(count for status, count in self.statuses.items() if status == "error" or status >= 400)
+
+    def to_dict(self, elapsed):
+        return {
+            "requests": self.latency.total,
+            "throughput": self.latency.total / elapsed if elapsed else 0.0,
+            "error_rate": self.errors / self.latency.total if self.latency.total else 0.0,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items(), key=str)},
+            "latency_ms": {
+                "p50": self.latency.percentile(50) * 1e3,
+                "p90": self.latency.percentile(90) * 1e3,
+                "p99": self.latency.percentile(99) * 1e3,
+                "p999": self.latency.percentile(99.9) * 1e3,
+                "max": self.latency.max / 1e3,
+            },
+        }
+
+
+# ---------- HTTP/1.1 client ----------
+
+class Connection:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, target, headers=None, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode() if body is not None else b""
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(data)}"]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + data)
+        await self.writer.drain()
+        return await read_response(self.reader)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+async def read_head(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    first, *header_lines = head.decode("latin-1").split("\r\n")
+    headers = {}
+    for line in header_lines:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return first, headers
+
+
+async def read_body(reader, headers):
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        parts = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()
+                return b"".join(parts)
+            parts.append(await reader.readexactly(size))
+            await reader.readline()
+    return await reader.readexactly(int(headers.get("content-length", 0)))
+
+
+async def read_response(reader):
+    status_line, headers = await read_head(reader)
+    body = await read_body(reader, headers)
+    return int(status_line.split()[1]), body
+
+
+class ConnectionPool:
+    def __init__(self, host, port, limit):
+        self.host = host
+        self.port = port
+        self.idle = []
+        self.slots = asyncio.Semaphore(limit)
+
+    async def request(self, *args, **kwargs):
+        async with self.slots:
+            conn = self.idle.pop() if self.idle else Connection(self.host, self.port)
+            try:
+                result = await conn.request(*args, **kwargs)
+            except BaseException:
+                conn.close()
+                raise
+            self.idle.append(conn)
+            return result
+
+    def close(self):
+        for conn in self.idle:
+            conn.close()
+
+
+# ---------- Replay ----------
+
+def load_requests(path, limit=None):
+    with open(path) as f:
+        requests = [json.loads(line) for line in f if line.strip()]
+    return requests[:limit] if limit else requests
+
+
+async def resolve_item_ids(pool, headers):
+    # Workload writes name items by catalog position. The API lists items
+    # newest first, so reversing the list gives positions in insertion order.
+    status, body = await pool.request("GET", "/api/items", headers)
+    if status != 200:
+        raise SystemExit(f"Could not list items to resolve ids (HTTP {status})")
+    return [item["_id"] for item in reversed(json.loads(body)["items"])]
+
+
+def build_request(record, ids):
+    method = record["method"]
+    query = dict(record.get("query") or {})
+    body = record.get("body")
+    if "item" in record and ids:
+        item_id = ids[record["item"] % len(ids)]
+        if method == "DELETE":
+            query["id"] = item_id
+        else:
+            body = {**(body or {}), "id": item_id}
+    target = record["path"] + ("?" + urlencode(query, doseq=True) if query else "")
+    return method, target, body
+
+
+async def send(pool, record, ids, headers, stats, scheduled):
+    method, target, body = build_request(record, ids)
+    try:
+        status, _ = await pool.request(method, target, headers, body)
+    except (OSError, asyncio.IncompleteReadError, ValueError):
+        status = "error"
+    shape = stats.setdefault(record.get("shape", method.lower()), ShapeStats())
+    shape.latency.record(time.perf_counter() - scheduled)
+    shape.statuses[status] += 1
+
+
+async def run_closed_loop(pool, requests, ids, headers, clients):
+    stats = {}
+    queue = iter(requests)
+
+    async def client():
+        for record in queue:
+            await send(pool, record, ids, headers, stats, time.perf_counter())
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return stats
+
+
+async def run_open_loop(pool, requests, ids, headers, rate):
+    stats = {}
+    start = time.perf_counter()
+    tasks = []
+    for i, record in enumerate(requests):
+        scheduled = start + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(send(pool, record, ids, headers, stats, scheduled)))
+    await asyncio.gather(*tasks)
+    return stats
+
+
+async def replay(host, port, requests, clients, rate, token, max_connections):
+    headers = {"Cookie": f"token={token}"} if token else {}
+    pool = ConnectionPool(host, port, max_connections if rate else clients)
+    try:
+        ids = await resolve_item_ids(pool, headers) if any("item" in r for r in requests) else []
+        start = time.perf_counter()
+        if rate:
+            stats = await run_open_loop(pool, requests, ids, headers, rate)
+        else:
+            stats = await run_closed_loop(pool, requests, ids, headers, clients)
+        return stats, time.perf_counter() - start
+    finally:
+        pool.close()
+
+
+# ---------- Stub server ----------
+
+class StubItemsApi:
+    # In-memory stand-in for app/api/items/route.ts. Authentication is not
+    # checked; every caller is treated as an admin.
+
+    def __init__(self, items):
+        self.items = {}
+        self.next_id = 0
+        for item in items:
+            self.insert(item)
+
+    def insert(self, item):
+        doc = {"_id": f"{self.next_id:024x}", **item, "createdAt": self.next_id, "updatedAt": self.next_id}
+        self.items[doc["_id"]] = doc
+        self.next_id += 1
+        return doc
+
+    def get(self, params):
+        search = (params.get("search") or [""])[0].strip()
+        categories = [c for c in params.get("category", []) if c.strip()]
+        try:
+            regex = re.compile(search, re.IGNORECASE) if search else None
+            category_regexes = [re.compile(c, re.IGNORECASE) for c in categories]
+        except re.error:
+            return 500, {"error": "Failed to fetch items"}
+        matches = [
+            doc for doc in self.items.values()
+            if (regex is None or regex.search(doc["name"]) or regex.search(doc["description"])
+                or regex.search(doc["category"]))
+            and (not category_regexes or any(r.search(doc["category"]) for r in category_regexes))
+        ]
+        matches.sort(key=lambda doc: doc["createdAt"], reverse=True)
+        return 200, {"items": matches}
+
+    def post(self, body):
+        if not all(body.get(field) not in (None, "") for field in ("name", "description", "category")) \
+                or body.get("quantity") is None or body.get("price") is None:
+            return 400, {"error": "All fields are required"}
+        doc = self.insert({field: body[field] for field in ("name", "description", "category", "quantity", "price")})
+        return 201, {"message": "Item created successfully", "item": doc}
+
+    def put(self, body):
+        if not body.get("id"):
+            return 400, {"error": "Item ID is required"}
+        doc = self.items.get(body["id"])
+        if doc is None:
+            return 404, {"error": "Item not found"}
+        doc.update({k: v for k, v in body.items() if k != "id" and v is not None})
+        doc["updatedAt"] = self.next_id
+        self.next_id += 1
+        return 200, {"message": "Item updated successfully", "item": doc}
+
+    def delete(self, params):
+        item_id = (params.get("id") or [""])[0]
+        if not item_id:
+            return 400, {"error": "Item ID is required"}
+        if self.items.pop(item_id, None) is None:
+            return 404, {"error": "Item not found"}
+        return 200, {"message": "Item deleted successfully"}
+
+    def handle(self, method, target, body):
+        url = urlsplit(target)
+        if url.path != "/api/items":
+            return 404, {"error": "Not found"}
+        params = parse_qs(url.query)
+        if method == "GET":
+            return self.get(params)
+        if method == "POST":
+            return self.post(body)
+        if method == "PUT":
+            return self.put(body)
+        if method == "DELETE":
+            return self.delete(params)
+        return 405, {"error": "Method not allowed"}
+
+
+async def serve_stub(api, ready):
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                request_line, headers = await read_head(reader)
+                raw = await read_body(reader, headers)
+                method, target, _ = request_line.split(" ", 2)
+                status, payload = api.handle(method, target, json.loads(raw) if raw else {})
+                data = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle_connection, "127.0.0.1", 0)
+    ready.send(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+
+def run_stub(items_path, ready):
+    asyncio.run(serve_stub(StubItemsApi(load_items(items_path)), ready))
+
+
+def start_stub(items_path):
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=run_stub, args=(items_path, child), daemon=True)
+    process.start()
+    if not parent.poll(60):
+        process.terminate()
+        raise SystemExit("Stub server did not start")
+    return process, parent.recv()
+
+
+# ---------- Report ----------
+
+def build_report(stats, elapsed, mode):
+    overall = ShapeStats()
+    for shape in stats.values():
+        overall.latency.merge(shape.latency)
+        overall.statuses.update(shape.statuses)
+    order = SHAPES + ["post", "put", "delete"]
+    return {
+        "mode": mode,
+        "elapsed": elapsed,
+        "overall": overall.to_dict(elapsed),
+        "shapes": {
+            name: stats[name].to_dict(elapsed)
+            for name in sorted(stats, key=lambda s: order.index(s) if s in order else len(order))
+        },
+    }
+
+
+def print_report(report):
+    print(f"Mode: {report['mode']}, elapsed {report['elapsed']:.2f}s")
+    print(f"{'shape':<16} {'requests':>8} {'req/s':>9} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8} {'p999 ms':>8}")
+    rows = list(report["shapes"].items()) + [("overall", report["overall"])]
+    for name, row in rows:
+        latency = row["latency_ms"]
+        print(f"{name:<16} {row['requests']:>8} {row['throughput']:>9.1f} {row['error_rate']:>7.1%} "
+              f"{latency['p50']:>8.2f} {latency['p99']:>8.2f} {latency['p999']:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a request workload against the items API.")
+    parser.add_argument("--requests", default="sample-data/requests.jsonl", help="workload file (JSON lines)")
+    parser.add_argument("--limit", type=int, default=None, help="replay only the first N requests")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default="http://localhost:3000", help="base URL of a running app")
+    target.add_argument("--stub", action="store_true", help="serve the API from a local in-memory stub")
+    parser.add_argument("--items", default="sample-data/items.json", help="stub catalog (JSON array or NDJSON)")
+    parser.add_argument("--token", default=None, help="JWT sent as the token cookie (needed for writes)")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--clients", type=int, default=8, help="closed loop: number of concurrent clients")
+    load.add_argument("--rate", type=float, default=None, help="open loop: requests per second")
+    parser.add_argument("--max-connections", type=int, default=256, help="open loop: connection limit")
+    parser.add_argument("--report", default=None, help="write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    requests = load_requests(args.requests, args.limit)
+    stub = None
+    if args.stub:
+        stub, port = start_stub(args.items)
+        host = "127.0.0.1"
+    else:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+
+    mode = f"open loop @ {args.rate:g} req/s" if args.rate else f"closed loop x {args.clients} clients"
+    try:
+        stats, elapsed = asyncio.run(replay(host, port, requests, args.clients, args.rate,
+                                            args.token, args.max_connections))
+    finally:
+        if stub is not None:
+            stub.terminate()
+
+    report = build_report(stats, elapsed, mode)
+    print_report(report)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+    if report["overall"]["requests"] == 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Shard Manifests
+
+generate_items.py --shards N splits its output into N files of (nearly)
+equal item count, and so nearly equal size, and writes a manifest that
+lists, per shard file: the half-open range of catalog positions it holds,
+its record count, byte size and SHA-256. Each shard is a complete file in
+the chosen format (its own JSON array, CSV header, ...), so loaders can
+claim shards independently. After a crash, a loader can skip shards it has
+already verified and loaded, and redo the rest.
+
+Shard paths in the manifest are relative to the manifest's directory.
+
+Usage:
+  python scripts/generate_items.py --count 10000000 --format ndjson --shards 16 -o items.ndjson
+  python scripts/shard_manifest.py verify items.manifest.json
+  python scripts/shard_manifest.py verify items.manifest.json --shard 3 --shard 4
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+VERSION = 1
+# Compression suffixes stay after the shard number: items-00003-of-00016.json.zst
+CODEC_SUFFIXES = (".gz", ".zst")
+
+
+def split_path(path):
+    # "items.json.zst" -> ("items", ".json.zst")
+    root, ext = os.path.splitext(path)
+    if ext in CODEC_SUFFIXES:
+        root, inner = os.path.splitext(root)
+        ext = inner + ext
+    return root, ext
+
+
+def shard_path(path, shard, shards):
+    root, ext = split_path(path)
+    return f"{root}-{shard:05d}-of-{shards:05d}{ext}"
+
+
+def manifest_path(path):
+    return split_path(path)[0] + ".manifest.json"
+
+
+def balanced_ranges(total, shards):
+    # Splits positions 0..total-1 into `shards` contiguous ranges whose
+    # lengths differ by at most one
+    bounds = [total * i // shards for i in range(shards + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+def file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def shard_entry(path, first, end, base_dir):
+    return {
+        "path": os.path.relpath(path, base_dir),
+        "first": first,
+        "end": end,
+        "records": end - first,
+        "bytes": os.path.getsize(path),
+        "sha256": file_sha256(path),
+    }
+
+
+def save(manifest, path):
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def load(path):
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get("version") != VERSION:
+        raise SystemExit(f"Unsupported manifest version in {path}: {manifest.get('version')}")
+    return manifest
+
+
+def verify_shard(entry, base_dir):
+    # Returns None if the shard file matches its entry, else what is wrong.
+    # The size is checked first so truncated files are caught without hashing.
+    path = os.path.join(base_dir, entry["path"])
+    if not os.path.exists(path):
+        return "missing"
+    size = os.path.getsize(path)
+    if size != entry["bytes"]:
+        return f"size {size}, expected {entry['bytes']}"
+    if file_sha256(path) != entry["sha256"]:
+        return "checksum mismatch"
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check shard files against their manifest.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    verify = sub.add_parser("verify", help="check each shard's size and checksum")
+    verify.add_argument("manifest")
+    verify.add_argument("--shard", type=int, action="append", default=None,
+                        help="only check this shard number; repeatable (default: all)")
+    args = parser.parse_args(argv)
+
+    manifest = load(args.manifest)
+    base_dir = os.path.dirname(os.path.abspath(args.manifest))
+    numbers = args.shard if args.shard is not None else range(len(manifest["shards"]))
+    failed = 0
+    for number in numbers:
+        if not 0 <= number < len(manifest["shards"]):
+            parser.error(f"shard {number} is not in the manifest ({len(manifest['shards'])} shards)")
+        entry = manifest["shards"][number]
+        problem = verify_shard(entry, base_dir)
+        failed += problem is not None
+        print(f"  {number:>5}  {entry['path']}  items {entry['first']}-{entry['end'] - 1}  "
+              f"{problem or 'ok'}")
+    print(f"{len(numbers) - failed} of {len(numbers)} shards verified")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Inventory Simulation
+
+Advances a generated catalog through simulated time and emits the ordered
+stream of changes the items API would see, shaped like MongoDB change
+stream events (operationType insert/update/delete, documentKey,
+fullDocument or updateDescription.updatedFields).
+
+Events arrive as a Poisson process at --rate events per simulated second.
+Each arrival is one of:
+  sale          quantity drops by a few units; SKUs are picked from a Zipf
+                distribution, so a small hot set takes most of the traffic
+  price_change  a small markdown or markup on a (Zipf-picked) SKU
+  restock       a random SKU gets a delivery
+  create        a new item from generate_item(), continuing the model numbers
+  delete        a random SKU is discontinued
+
+When a sale leaves a SKU below --restock-threshold, a restock is scheduled
+after an exponentially distributed lead time, sized to the demand seen
+since the last delivery. Sales of an empty SKU are counted as stockouts
+and emit nothing.
+
+Events are written as NDJSON in files of --chunk-size events
+(events-000000.ndjson, ...), so replaying chunk by chunk against a growing
+dataset shows how write amplification and cache invalidation evolve.
+Catalog position is the document key, as in generate_workload.py.
+
+Usage:
+  python scripts/simulate_inventory.py --events 1000000 --rate 50 -o sample-data/events
+  python scripts/simulate_inventory.py --items sample-data/items.json --events 100000 --chunk-size 5000
+"""
+import argparse
+import heapq
+import itertools
+import json
+import os
+import random
+import time
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import generate_items as gi
+from generate_workload import Zipf
+
+DEFAULT_MIX = {"sale": 0.80, "price_change": 0.08, "restock": 0.06, "create": 0.04, "delete": 0.02}
+
+
+class Inventory:
+    # Mutable per-item state; names and descriptions never change, so only
+    # the fields events touch are kept
+    def __init__(self, items):
+        self.categories = []
+        self.quantity = array("i")
+        self.price_cents = array("q")
+        self.alive = bytearray()
+        for item in items:
+            self.add(item)
+        self.initial_size = len(self)
+
+    def __len__(self):
+        return len(self.quantity)
+
+    def add(self, item):
+        self.categories.append(item["category"])
+        self.quantity.append(item["quantity"])
+        self.price_cents.append(round(item["price"] * 100))
+        self.alive.append(1)
+        return len(self) - 1
+
+
+class Simulation:
+    def __init__(self, inventory, seed, rate, mix=None, zipf_s=1.1, restock_threshold=20,
+                 lead_time_hours=2.0, start=None):
+        self.inventory = inventory
+        self.rng = random.Random(seed)
+        self.rate = rate
+        mix = mix or DEFAULT_MIX
+        self.kinds = list(mix)
+        self.cum_weights = list(itertools.accumulate(mix.values()))
+        self.hot = Zipf(range(inventory.initial_size), zipf_s, self.rng)
+        self.restock_threshold = restock_threshold
+        self.lead_time = lead_time_hours * 3600
+        self.start = start or datetime.now(timezone.utc)
+        self.clock = 0.0
+        self.pending = []          # (due time, position) heap of scheduled restocks
+        self.scheduled = set()
+        self.sold = Counter()      # units sold per position since its last restock
+        self.seq = 0
+        self.created = 0
+        self.stats = Counter()
+
+    def pick_hot(self):
+        # Zipf over the starting catalog, or a uniformly chosen created item
+        # in proportion to how much of the catalog those make up
+        inventory = self.inventory
+        for _ in range(8):
+            if len(inventory) > inventory.initial_size and \
+                    self.rng.random() < 1 - inventory.initial_size / len(inventory):
+                position = self.rng.randrange(inventory.initial_size, len(inventory))
+            else:
+                position = self.hot.sample(self.rng)
+            if inventory.alive[position]:
+                return position
+        return None
+
+    def pick_any(self):
+        for _ in range(8):
+            position = self.rng.randrange(len(self.inventory))
+            if self.inventory.alive[position]:
+                return position
+        return None
+
+    def event(self, operation, position, reason, **body):
+        self.seq += 1
+        self.stats[reason] += 1
+        timestamp = self.start + timedelta(seconds=self.clock)
+        return {
+            "seq": self.seq,
+            "clusterTime": timestamp.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "operationType": operation,
+            "documentKey": {"item": position},
+            "reason": reason,
+            **body,
+        }
+
+    def update(self, position, reason, **fields):
+        inventory = self.inventory
+        if "quantity" in fields:
+            inventory.quantity[position] = fields["quantity"]
+        if "price" in fields:
+            inventory.price_cents[position] = round(fields["price"] * 100)
+        return self.event("update", position, reason, updateDescription={"updatedFields": fields})
+
+    def restock(self, position, reason="restock"):
+        # Deliveries cover at least twice the demand seen since the last one,
+        # so hot SKUs get bigger orders
+        self.scheduled.discard(position)
+        delivered = max(self.rng.randint(100, 500), 2 * self.sold.pop(position, 0))
+        quantity = self.inventory.quantity[position] + delivered
+        return self.update(position, reason, quantity=quantity)
+
+    def sale(self):
+        position = self.pick_hot()
+        if position is None:
+            return None
+        inventory = self.inventory
+        on_hand = inventory.quantity[position]
+        if on_hand == 0:
+            self.stats["stockout"] += 1
+            self.sold[position] += 1
+            return None
+        sold = min(on_hand, 1 + int(self.rng.expovariate(0.5)))
+        self.sold[position] += sold
+        if on_hand - sold < self.restock_threshold and position not in self.scheduled:
+            self.scheduled.add(position)
+            heapq.heappush(self.pending, (self.clock + self.rng.expovariate(1 / self.lead_time), position))
+        return self.update(position, "sale", quantity=on_hand - sold)
+
+    def price_change(self):
+        position = self.pick_hot()
+        if position is None:
+            return None
+        # Mostly small markdowns, sometimes a markup
+        factor = 1 + self.rng.choice([-1, -1, 1]) * self.rng.uniform(0.01, 0.15)
+        price = max(round(self.inventory.price_cents[position] * factor / 100, 2), 0.01)
+        return self.update(position, "price_change", price=price)
+
+    def create(self):
+        category = gi.categories[self.rng.randrange(len(gi.categories))]
+        index = self.inventory.initial_size - len(gi.existing_items) + self.created
+        self.created += 1
+        item = gi.generate_item(category, index, self.rng)
+        position = self.inventory.add(item)
+        return self.event("insert", position, "create", fullDocument=item)
+
+    def delete(self):
+        position = self.pick_any()
+        if position is None:
+            return None
+        self.inventory.alive[position] = 0
+        self.scheduled.discard(position)
+        return self.event("delete", position, "delete")
+
+    def run(self, count):
+        # Yields `count` events in time order
+        emitted = 0
+        while emitted < count:
+            arrival = self.clock + self.rng.expovariate(self.rate)
+            while self.pending and self.pending[0][0] <= arrival and emitted < count:
+                due, position = heapq.heappop(self.pending)
+                if not self.inventory.alive[position]:
+                    continue
+                self.clock = due
+                yield self.restock(position, "scheduled_restock")
+                emitted += 1
+            if emitted >= count:
+                break
+            self.clock = arrival
+            kind = self.rng.choices(self.kinds, cum_weights=self.cum_weights)[0]
+            if kind == "restock":
+                position = self.pick_any()
+                event = self.restock(position) if position is not None else None
+            else:
+                event = getattr(self, kind)()
+            if event is not None:
+                yield event
+                emitted += 1
+
+
+def write_chunks(events, directory, chunk_size):
+    # Returns (files written, distinct documents touched per chunk)
+    os.makedirs(directory, exist_ok=True)
+    files = 0
+    touched = []
+    lines = []
+    keys = set()
+
+    def flush():
+        nonlocal files
+        with open(os.path.join(directory, f"events-{files:06d}.ndjson"), 'w') as f:
+            f.write("".join(lines))
+        files += 1
+        touched.append(len(keys))
+        lines.clear()
+        keys.clear()
+
+    for event in events:
+        lines.append(json.dumps(event) + "\n")
+        keys.add(event["documentKey"]["item"])
+        if len(lines) >= chunk_size:
+            flush()
+    if lines:
+        flush()
+    return files, touched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate inventory churn and write a change event stream.")
+    parser.add_argument("--items", default=None, help="starting catalog (json or ndjson; default: generate one)")
+    parser.add_argument("--count", type=int, default=5000, help="new items in a generated starting catalog")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the starting catalog and the simulation")
+    parser.add_argument("--events", type=int, default=100000, help="number of events to emit")
+    parser.add_argument("--rate", type=float, default=10.0, help="event arrivals per simulated second")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="events per output file")
+    parser.add_argument("-o", "--output", default="sample-data/events", help="output directory")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=None,
+                        help="simulated start time as an ISO timestamp (default: now, UTC)")
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent for SKU popularity")
+    parser.add_argument("--restock-threshold", type=int, default=20, help="quantity that triggers a reorder")
+    parser.add_argument("--lead-time-hours", type=float, default=2.0, help="mean restock lead time")
+    mix = parser.add_argument_group("event mix (relative weights)")
+    for kind, weight in DEFAULT_MIX.items():
+        mix.add_argument(f"--{kind.replace('_', '-')}", type=float, default=weight, dest=kind)
+    args = parser.parse_args(argv)
+
+    weights = {kind: getattr(args, kind) for kind in DEFAULT_MIX}
+    if any(weight < 0 for weight in weights.values()) or not sum(weights.values()):
+        parser.error("event mix weights must be non-negative and not all zero")
+    if args.rate <= 0 or args.chunk_size < 1:
+        parser.error("--rate and --chunk-size must be positive")
+
+    start = args.start
+    if start is not None and start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    items = gi.load_items(args.items) if args.items else gi.iter_all_items(args.count, args.seed)
+    inventory = Inventory(items)
+    simulation = Simulation(inventory, args.seed, args.rate, weights, args.zipf_s, args.restock_threshold,
+                            args.lead_time_hours, start)
+
+    began = time.perf_counter()
+    updates = Counter()
+
+    def tracked(events):
+        for event in events:
+            if event["operationType"] == "update":
+                updates[event["documentKey"]["item"]] += 1
+            yield event
+
+    files, touched = write_chunks(tracked(simulation.run(args.events)), args.output, args.chunk_size)
+    elapsed = time.perf_counter() - began
+
+    hot_count = max(1, inventory.initial_size // 100)
+    hot_updates = sum(count for _, count in updates.most_common(hot_count))
+    print(f"Wrote {simulation.seq:,} events in {files} chunks to {args.output} ({elapsed:.2f}s)")
+    print(f"Simulated {timedelta(seconds=round(simulation.clock))} at {args.rate:g} events/s")
+    print(f"Catalog: {inventory.initial_size:,} -> {sum(inventory.alive):,} live items "
+          f"({simulation.created:,} created, {len(inventory) - sum(inventory.alive):,} deleted)")
+    print(f"Updates: {sum(updates.values()):,} across {len(updates):,} items; "
+          f"top 1% of SKUs took {hot_updates / max(sum(updates.values()), 1):.1%}")
+    print(f"Distinct documents touched per chunk: avg {sum(touched) / max(len(touched), 1):,.0f}")
+    print("\nEvents by reason (stockouts emit no event):")
+    for reason, count in simulation.stats.most_common():
+        print(f"  {reason}: {count:,}")
+
+
+if __name__ == "__main__":
+    main()
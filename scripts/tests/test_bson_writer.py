@@ -0,0 +1,68 @@
+"""
+Checks the BSON encoder against bytes worked out by hand from the BSON
+spec and, when pymongo is installed, against its reference codec, so a
+mistake shared by encode_document and decode_document can't pass.
+
+Usage:
+  python -m pytest scripts/tests
+"""
+from datetime import datetime, timezone
+
+import pytest
+
+import bson_writer
+import generate_items as gi
+
+GOLDEN_DOCUMENT = {
+    "_id": bson_writer.ObjectId("659200800102030405000001"),
+    "name": "Pen",
+    "quantity": 7,
+    "price": 1.5,
+    "createdAt": datetime(2024, 1, 1, tzinfo=timezone.utc),
+    "__v": 0,
+}
+
+GOLDEN_BYTES = bytes.fromhex(
+    "5d000000"                                          # document size, 93
+    "07" "5f696400" "659200800102030405000001"          # ObjectId _id
+    "02" "6e616d6500" "04000000" "50656e00"             # string name, length 4 with NUL
+    "10" "7175616e7469747900" "07000000"                # int32 quantity
+    "01" "707269636500" "000000000000f83f"              # double price, 1.5
+    "09" "63726561746564417400" "00f451c28c010000"      # datetime createdAt, 1704067200000 ms
+    "10" "5f5f7600" "00000000"                          # int32 __v
+    "00"
+)
+
+
+def test_golden_document():
+    assert bson_writer.encode_document(GOLDEN_DOCUMENT) == GOLDEN_BYTES
+    assert bson_writer.decode_document(GOLDEN_BYTES) == (GOLDEN_DOCUMENT, len(GOLDEN_BYTES))
+
+
+def reference_codec():
+    bson = pytest.importorskip("bson")
+    if not hasattr(bson, "decode_all"):
+        pytest.skip("bson is not pymongo's codec")
+    return bson
+
+
+def test_dump_matches_reference_codec(tmp_path):
+    bson = reference_codec()
+    path = str(tmp_path / "items.bson")
+    gi.main(["--count", "500", "--format", "bson", "--seed", "7", "--time-end", "2026-01-01T00:00:00",
+             "--created-by", "0123456789abcdef01234567", "-o", path])
+    with open(path, "rb") as f:
+        data = f.read()
+
+    expected = bson.decode_all(data, bson.CodecOptions(tz_aware=True))
+    docs = list(bson_writer.iter_documents(data))
+    assert len(docs) == len(expected) == len(gi.existing_items) + 500
+    for doc, reference in zip(docs, expected):
+        assert list(doc) == list(reference)
+        for key, value in doc.items():
+            if isinstance(value, bson_writer.ObjectId):
+                assert reference[key] == bson.ObjectId(bytes(value))
+            else:
+                assert reference[key] == value and type(reference[key]) is type(value)
+        assert bson.encode(reference) == bson_writer.encode_document(doc)
+    assert expected[0]["createdBy"] == bson.ObjectId("0123456789abcdef01234567")
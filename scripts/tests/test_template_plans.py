@@ -0,0 +1,117 @@
+"""
+Checks that the compiled template plans reproduce the original
+generate_item dispatch exactly: same names, descriptions, prices and
+quantities from the same seeded RNG, for every template.
+"""
+import random
+
+import pytest
+
+import generate_items as gi
+
+
+def baseline_item(templates, category, index, rng):
+    # generate_item as it was before templates were compiled into plans,
+    # with the module-level random calls routed through rng
+    template = rng.choice(templates)
+    name_template, desc_template, min_price, max_price = template
+    adj = rng.choice(gi.adjectives)
+
+    if "{}" in name_template:
+        if "Monitor" in name_template or "Camera" in name_template or "Speaker" in name_template:
+            name = name_template.format(rng.choice(gi.specs["screen_size"]))
+        elif "Phone" in name_template:
+            name = name_template.format(rng.choice(["Desk", "Conference", "Wireless", "VoIP"]))
+        elif "Chair" in name_template:
+            name = name_template.format(rng.choice(["Executive", "Mesh", "Leather", "Task"]))
+        elif "Desk" in name_template:
+            name = name_template.format(rng.choice(["Standing", "Executive", "Corner", "Computer"]))
+        else:
+            name = name_template.format(adj)
+    else:
+        name = f"{adj} {name_template}"
+    name = f"{name} - Model {index+1:04d}"
+
+    placeholder_count = desc_template.count('{}')
+    if placeholder_count == 0:
+        desc = desc_template
+    elif placeholder_count == 1:
+        if "RAM" in desc_template or "memory" in desc_template.lower():
+            desc = desc_template.format(rng.choice(gi.specs["ram"]))
+        elif "storage" in desc_template or "TB" in desc_template or "GB" in desc_template:
+            desc = desc_template.format(rng.choice(gi.specs["capacity"]))
+        elif "watt" in desc_template.lower():
+            desc = desc_template.format(rng.choice(gi.specs["watts"]))
+        elif "user" in desc_template.lower() or "license" in desc_template.lower():
+            desc = desc_template.format(rng.choice(gi.specs["users"]))
+        elif "port" in desc_template.lower():
+            desc = desc_template.format(rng.choice(gi.specs["ports"]))
+        elif "ft" in desc_template or "meter" in desc_template.lower():
+            desc = desc_template.format(rng.choice(gi.specs["length"]))
+        elif "count" in desc_template.lower() or "pack" in desc_template.lower():
+            desc = desc_template.format(rng.choice(gi.specs["count"]))
+        elif "month" in desc_template.lower():
+            desc = desc_template.format(rng.choice(gi.specs["months"]))
+        elif "resolution" in desc_template.lower():
+            desc = desc_template.format(rng.choice(gi.specs["resolution"]))
+        else:
+            desc = desc_template.format(adj)
+    elif placeholder_count == 2:
+        if "RAM" in desc_template or "memory" in desc_template.lower():
+            desc = desc_template.format(rng.choice(gi.specs["ram"]), rng.choice(gi.specs["storage"]))
+        elif "storage" in desc_template:
+            desc = desc_template.format(rng.choice(gi.specs["capacity"]), rng.choice(["SSD", "HDD", "NVMe"]))
+        else:
+            desc = desc_template.format(adj, rng.choice(gi.specs["color"]))
+    elif placeholder_count == 3:
+        if "display" in desc_template or "monitor" in desc_template.lower() or "screen" in desc_template:
+            desc = desc_template.format(rng.choice(gi.specs["screen_size"]), rng.choice(["IPS", "VA", "TN", "OLED"]),
+                                        rng.choice(gi.specs["refresh_rate"]))
+        else:
+            desc = desc_template.format(adj, rng.choice(gi.specs["color"]),
+                                        rng.choice(["Standard", "Premium", "Professional"]))
+    else:
+        desc = desc_template
+
+    price = round(rng.uniform(min_price, max_price), 2)
+    quantity = rng.randint(5, 500)
+    return {"name": name, "description": desc, "category": category, "quantity": quantity, "price": price}
+
+
+@pytest.fixture(autouse=True)
+def default_width():
+    gi.set_model_width(4)
+    yield
+    gi.set_model_width(4)
+
+
+TEMPLATES = [(category, template) for category, templates in gi.product_templates.items() for template in templates]
+
+
+@pytest.mark.parametrize("category,template", TEMPLATES, ids=[t[1][0] for t in TEMPLATES])
+def test_plan_matches_baseline(monkeypatch, category, template):
+    # One template at a time, so every slot binding is exercised
+    monkeypatch.setattr(gi, "template_plans", {category: [gi.compile_template(template)]})
+    for seed in range(50):
+        expected = baseline_item([template], category, seed, random.Random(seed))
+        assert gi.generate_item(category, seed, random.Random(seed)) == expected
+
+
+def test_catalog_matches_baseline():
+    # The full dispatch, template choice included, over a few thousand items
+    baseline_rng, rng = random.Random(42), random.Random(42)
+    for index in range(5000):
+        category = gi.categories[index % len(gi.categories)]
+        expected = baseline_item(gi.product_templates[category], category, index, baseline_rng)
+        assert gi.generate_item(category, index, rng) == expected
+
+
+def test_slot_rules():
+    assert gi.name_slots_for("{} Monitor") == [gi.specs["screen_size"]]
+    assert gi.name_slots_for("{} Office Chair") == [gi.CHAIR_TYPES]
+    assert gi.description_slots_for("No placeholders here") == []
+    assert gi.description_slots_for("{}GB of RAM") == [gi.specs["ram"]]
+    assert gi.description_slots_for("A {} finish in {}") == [gi.ADJ, gi.specs["color"]]
+    assert gi.bind_description("A {} finish in {}", [gi.ADJ, gi.specs["color"]]) == (
+        "A {0} finish in {1}", [gi.specs["color"]])
+    assert gi.bind_description("Literal {braces}", []) == ("Literal {{braces}}", [])
@@ -0,0 +1,282 @@
+"""
+Trigram Index
+
+Builds a trigram inverted index over the name, description and category of
+a generated catalog, written as a compact sidecar file next to it, and
+evaluates GET /api/items searches against it.
+
+The route matches `{ $regex: search, $options: 'i' }` on all three fields,
+which scans every document. For literal searches of three or more
+characters, the index narrows the scan to items containing every trigram of
+the search, and each candidate is then checked with the same
+case-insensitive regex. Other searches (shorter, or containing regex
+syntax) fall back to checking every item, so results always match a linear
+scan. Results come back newest first, like the route's
+sort({ createdAt: -1 }), taking catalog position as insertion order.
+
+Sidecar layout (little-endian):
+  b"TRG1", u32 item count, u32 term count
+  per term, in sorted order: u8 length, UTF-8 trigram, u32 postings, u64 offset
+  posting lists: item ids as LEB128 varints of the gap to the previous id
+
+Usage:
+  python scripts/trigram_index.py build sample-data/items.json       # -> sample-data/items.json.trgm
+  python scripts/trigram_index.py query sample-data/items.json "ssd" --category Storage
+  python scripts/trigram_index.py bench sample-data/items.json --requests sample-data/requests.jsonl
+"""
+import argparse
+import json
+import re
+import struct
+import sys
+import time
+
+from generate_items import load_items
+
+MAGIC = b"TRG1"
+FIELDS = ("name", "description", "category")
+REGEX_SYNTAX = set(".^$*+?{}[]\\|()")
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def item_trigrams(item):
+    # Trigrams never span two fields, since the regex is matched per field
+    grams = set()
+    for field in FIELDS:
+        grams |= trigrams(item[field].lower())
+    return grams
+
+
+def build_postings(items):
+    postings = {}
+    for item_id, item in enumerate(items):
+        for gram in item_trigrams(item):
+            postings.setdefault(gram, []).append(item_id)
+    return postings
+
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode_postings(ids):
+    out = bytearray()
+    previous = 0
+    for item_id in ids:
+        encode_varint(item_id - previous, out)
+        previous = item_id
+    return bytes(out)
+
+
+def decode_postings(data, offset, count):
+    ids = []
+    previous = 0
+    for _ in range(count):
+        value = shift = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        previous += value
+        ids.append(previous)
+    return ids
+
+
+def write_index(postings, item_count, path):
+    terms = sorted(postings)
+    table = bytearray()
+    blob = bytearray()
+    for term in terms:
+        encoded = term.encode()
+        table += struct.pack("<B", len(encoded)) + encoded
+        table += struct.pack("<IQ", len(postings[term]), len(blob))
+        blob += encode_postings(postings[term])
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<II", item_count, len(terms)))
+        f.write(table)
+        f.write(blob)
+    return 12 + len(table) + len(blob)
+
+
+class TrigramIndex:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:4] != MAGIC:
+            raise ValueError(f"{path} is not a trigram index")
+        self.item_count, term_count = struct.unpack_from("<II", data, 4)
+        self.terms = {}
+        pos = 12
+        for _ in range(term_count):
+            length = data[pos]
+            term = data[pos + 1:pos + 1 + length].decode()
+            pos += 1 + length
+            self.terms[term] = struct.unpack_from("<IQ", data, pos)
+            pos += 12
+        self.blob = data[pos:]
+        self._cache = {}
+
+    @classmethod
+    def from_items(cls, items):
+        # In-memory index with every posting list already decoded
+        index = cls.__new__(cls)
+        index.item_count = len(items)
+        index._cache = build_postings(items)
+        index.terms = {term: (len(ids), None) for term, ids in index._cache.items()}
+        index.blob = b""
+        return index
+
+    def postings(self, term):
+        if term not in self._cache:
+            count, offset = self.terms.get(term, (0, 0))
+            self._cache[term] = decode_postings(self.blob, offset, count)
+        return self._cache[term]
+
+    def candidates(self, search):
+        # Ids that can match a literal search, or None when every item must be checked
+        if len(search) < 3 or REGEX_SYNTAX & set(search):
+            return None
+        lists = sorted((self.postings(gram) for gram in trigrams(search.lower())), key=len)
+        result = set(lists[0])
+        for ids in lists[1:]:
+            result.intersection_update(ids)
+            if not result:
+                break
+        return result
+
+
+def compile_filter(search, categories):
+    # Same predicates the route builds; re.error plays the part of its 500
+    regex = re.compile(search, re.IGNORECASE) if search else None
+    category_regexes = [re.compile(c, re.IGNORECASE) for c in categories]
+
+    def matches(item):
+        if regex is not None and not any(regex.search(item[field]) for field in FIELDS):
+            return False
+        return not category_regexes or any(r.search(item["category"]) for r in category_regexes)
+
+    return matches
+
+
+def normalize_query(search, categories):
+    return (search or "").strip(), [c for c in (categories or []) if c.strip()]
+
+
+def linear_search(items, search, categories=()):
+    search, categories = normalize_query(search, categories)
+    matches = compile_filter(search, categories)
+    return [item_id for item_id in range(len(items) - 1, -1, -1) if matches(items[item_id])]
+
+
+def indexed_search(index, items, search, categories=()):
+    search, categories = normalize_query(search, categories)
+    matches = compile_filter(search, categories)
+    candidates = index.candidates(search) if search else None
+    ids = range(len(items) - 1, -1, -1) if candidates is None else sorted(candidates, reverse=True)
+    return [item_id for item_id in ids if matches(items[item_id])]
+
+
+def index_path(items_path):
+    return items_path + ".trgm"
+
+
+def build(args):
+    items = load_items(args.items)
+    start = time.perf_counter()
+    postings = build_postings(items)
+    size = write_index(postings, len(items), args.output or index_path(args.items))
+    elapsed = time.perf_counter() - start
+    entries = sum(len(ids) for ids in postings.values())
+    print(f"Indexed {len(items)} items in {elapsed:.2f}s")
+    print(f"Trigrams: {len(postings)}, postings: {entries}")
+    print(f"Index size: {size / 1e6:.2f}MB ({size / max(entries, 1):.2f} bytes/posting, "
+          f"{size / (entries * 4 + 1):.0%} of fixed 32-bit ids)")
+
+
+def query(args):
+    items = load_items(args.items)
+    index = TrigramIndex(args.index or index_path(args.items))
+    ids = indexed_search(index, items, args.search, args.category)
+    for item_id in ids[:args.limit]:
+        print(f"{item_id:>8}  {items[item_id]['name']}")
+    print(f"{len(ids)} matches")
+
+
+def searches_from_workload(path):
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            query_params = record.get("query") or {}
+            if record.get("method") == "GET" and query_params.get("search"):
+                yield query_params["search"], query_params.get("category", [])
+
+
+def bench(args):
+    items = load_items(args.items)
+    index = TrigramIndex(args.index or index_path(args.items))
+    queries = list(searches_from_workload(args.requests))[:args.limit]
+
+    linear_time = indexed_time = 0.0
+    checked = mismatched = invalid = 0
+    for search, categories in queries:
+        try:
+            start = time.perf_counter()
+            expected = linear_search(items, search, categories)
+            linear_time += time.perf_counter() - start
+            start = time.perf_counter()
+            actual = indexed_search(index, items, search, categories)
+            indexed_time += time.perf_counter() - start
+        except re.error:
+            invalid += 1
+            continue
+        checked += 1
+        if actual != expected:
+            mismatched += 1
+            print(f"Mismatch for search={search!r} categories={categories}")
+
+    print(f"Queries: {checked} checked, {invalid} invalid regex (route returns 500), {mismatched} mismatched")
+    print(f"Linear regex scan: {linear_time:.3f}s, trigram index: {indexed_time:.3f}s "
+          f"({linear_time / indexed_time if indexed_time else 0:.1f}x speedup)")
+    if mismatched:
+        sys.exit(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trigram index for case-insensitive item search.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("build", help="write the index sidecar for an items file")
+    p.add_argument("items", help="items file (json or ndjson)")
+    p.add_argument("-o", "--output", default=None, help="index path (default: <items>.trgm)")
+    p.set_defaults(run=build)
+
+    p = commands.add_parser("query", help="run one search through the index")
+    p.add_argument("items", help="items file (json or ndjson)")
+    p.add_argument("search", help="search string, as sent to GET /api/items")
+    p.add_argument("--category", action="append", default=[], help="category filter (repeatable)")
+    p.add_argument("--index", default=None, help="index path (default: <items>.trgm)")
+    p.add_argument("--limit", type=int, default=20, help="matches to print")
+    p.set_defaults(run=query)
+
+    p = commands.add_parser("bench", help="check index results against a linear scan and time both")
+    p.add_argument("items", help="items file (json or ndjson)")
+    p.add_argument("--requests", default="sample-data/requests.jsonl", help="workload file to take searches from")
+    p.add_argument("--index", default=None, help="index path (default: <items>.trgm)")
+    p.add_argument("--limit", type=int, default=2000, help="number of searches to run")
+    p.set_defaults(run=bench)
+
+    args = parser.parse_args(argv)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Virtual Items
+
+Random-access, counter-based item generation. Every item is a pure function
+of (seed, index): its random draws are read from a BLAKE2b hash of the index,
+keyed by the seed, instead of from an RNG stream. Item 3,000,000 therefore
+costs the same as item 0, with nothing generated before it.
+
+VirtualCatalog exposes a catalog of any size as a lazy read-only sequence
+with len(), indexing and slicing; items are only built when accessed.
+Indexes match generate_items.py (index i is "Model {i+1}", category
+i % 14, model numbers padded to the same width generate_items.py picks for
+the catalog size unless given), and `--engine counter` writes exactly these
+items to a file.
+Items are not the same as the python or numpy engines' for the same seed.
+
+Usage:
+  python scripts/virtual_items.py --count 100000000 --seed 7 --start 3000000 --stop 3000005
+  python scripts/generate_items.py --engine counter --count 1000000 --seed 7 -o items.json
+"""
+import argparse
+import hashlib
+import json
+import struct
+import sys
+import time
+from collections.abc import Sequence
+
+import generate_items as gi
+
+# 16 32-bit words per item: template, adjective, name slot, price, quantity,
+# then one per description slot
+WORDS = struct.Struct("<16I")
+PERSON = b"virtual-items"
+
+
+def seed_key(seed):
+    return hashlib.sha256(f"{seed}".encode()).digest()
+
+
+def pick(word, n):
+    # Maps a uniform 32-bit word onto range(n)
+    return (word * n) >> 32
+
+
+def make_item(key, index, template_plans):
+    words = WORDS.unpack(hashlib.blake2b(index.to_bytes(8, "little"), key=key, person=PERSON).digest())
+    category = gi.categories[index % len(gi.categories)]
+    plans = template_plans[category]
+    name_format, name_pool, desc_format, desc_pools, min_price, max_price = plans[pick(words[0], len(plans))]
+    adj = gi.adjectives[pick(words[1], len(gi.adjectives))]
+    name_value = adj if name_pool is gi.ADJ else name_pool[pick(words[2], len(name_pool))]
+    values = [pool[pick(word, len(pool))] for pool, word in zip(desc_pools, words[5:])]
+    return {
+        "name": name_format.format(name_value, index + 1),
+        "description": desc_format.format(adj, *values),
+        "category": category,
+        "quantity": 5 + pick(words[4], 496),
+        "price": round(min_price + (max_price - min_price) * words[3] / 2**32, 2)
+    }
+
+
+class VirtualCatalog(Sequence):
+    def __init__(self, count, seed, indexes=None, width=None):
+        self.count = count
+        self.seed = seed
+        self.key = seed_key(seed)
+        self.width = width or gi.model_width_for(count)
+        self.plans = gi.plans_for_width(self.width)
+        # Slices are views onto the same catalog, kept as a range of indexes
+        self.indexes = range(count) if indexes is None else indexes
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return VirtualCatalog(self.count, self.seed, self.indexes[i], self.width)
+        try:
+            index = self.indexes[i]
+        except IndexError:
+            raise IndexError("catalog index out of range") from None
+        return make_item(self.key, index, self.plans)
+
+    def __iter__(self):
+        key, plans = self.key, self.plans
+        for index in self.indexes:
+            yield make_item(key, index, plans)
+
+    def __repr__(self):
+        return f"VirtualCatalog(count={self.count}, seed={self.seed}, indexes={self.indexes}, width={self.width})"
+
+
+def shard_items(seed, shard, count, width=None):
+    # Shard-at-a-time access for generate_items.py --engine counter
+    start = shard * gi.SHARD_SIZE
+    return list(VirtualCatalog(count, seed, width=width or gi.MODEL_WIDTH)[start:start + gi.SHARD_SIZE])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print a window of a virtual item catalog.")
+    parser.add_argument("--count", type=int, default=100_000_000, help="virtual catalog size")
+    parser.add_argument("--seed", type=int, default=0, help="catalog seed")
+    parser.add_argument("--start", type=int, default=0, help="first index to print")
+    parser.add_argument("--stop", type=int, default=None, help="index to stop before (default: start + 10)")
+    parser.add_argument("--step", type=int, default=1, help="index step")
+    args = parser.parse_args(argv)
+
+    stop = args.start + 10 if args.stop is None else args.stop
+    window = VirtualCatalog(args.count, args.seed)[args.start:stop:args.step]
+    start = time.perf_counter()
+    for item in window:
+        print(json.dumps(item))
+    elapsed = time.perf_counter() - start
+    print(f"{len(window)} of {args.count:,} items in {elapsed * 1000:.2f}ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()